@@ -14,6 +14,23 @@ class Settings(BaseSettings):
     # GitHub
     github_token: str = ""
     github_username: str = ""
+    github_fetch_concurrency: int = 8  # Max repositories fetched in parallel during refresh
+    github_max_connections: int = 20  # Pooled connections in the shared GitHub HTTP client
+    github_keepalive_expiry: float = 30.0  # Seconds an idle pooled connection is kept alive
+    github_fetch_backend: str = "rest"  # "rest" (per-repo calls) or "graphql" (batched, needs token)
+    github_graphql_batch_size: int = 25  # Repositories per GraphQL query
+    github_rate_limit_low_watermark: int = 100  # Serialize requests below this remaining budget
+    github_max_retries: int = 3  # Retries for rate-limited / transient GitHub failures
+    github_max_rate_limit_wait: float = 60.0  # Longest rate-limit pause (seconds) before giving up
+    github_webhook_secret: str = ""  # Secret configured on the GitHub webhook (HMAC SHA-256)
+    github_webhook_debounce: float = 10.0  # Seconds to wait for more pushes before resyncing a repo
+    refresh_upsert_batch_size: int = 20  # Repos written per bulk upsert during refresh
+    repos_cache_max_age: int = 60  # Cache-Control max-age (seconds) for public repository responses
+    analytics_queue_size: int = 10000  # Buffered analytics beacons before new ones are dropped
+    analytics_batch_size: int = 500  # Max beacons written per flush
+    analytics_flush_interval: float = 0.5  # Seconds between analytics flushes
+    snapshot_dir: str = ""  # Export static JSON snapshots here after refreshes and admin edits (empty = disabled)
+    snapshot_export_debounce: float = 2.0  # Seconds to wait for more admin edits before re-exporting
     
     # CORS
     cors_origins: str = "http://localhost:5173"
@@ -1,5 +1,6 @@
 import asyncpg
 import logging
+import orjson
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
@@ -154,6 +155,48 @@ CREATE TABLE IF NOT EXISTS project_requests (
     updated_at TIMESTAMP DEFAULT NOW()
 );
 
+-- GitHub API conditional request cache (ETag / Last-Modified)
+CREATE TABLE IF NOT EXISTS github_response_cache (
+    url TEXT PRIMARY KEY,
+    etag VARCHAR(255),
+    last_modified VARCHAR(100),
+    link TEXT,
+    body TEXT NOT NULL,
+    cached_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Parsed portfolio/meta.json keyed by git blob SHA
+CREATE TABLE IF NOT EXISTS portfolio_meta_cache (
+    sha VARCHAR(40) PRIMARY KEY,
+    meta JSONB NOT NULL,
+    cached_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Repository refresh runs (checkpoints for resumable syncs)
+CREATE TABLE IF NOT EXISTS refresh_runs (
+    id VARCHAR(32) PRIMARY KEY,
+    full_sync BOOLEAN DEFAULT FALSE,
+    status VARCHAR(20) NOT NULL,
+    message TEXT,
+    total INTEGER DEFAULT 0,
+    done INTEGER DEFAULT 0,
+    updated_count INTEGER DEFAULT 0,
+    changed_count INTEGER DEFAULT 0,
+    skipped_count INTEGER DEFAULT 0,
+    errors JSONB DEFAULT '[]',
+    started_at TIMESTAMP DEFAULT NOW(),
+    finished_at TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS refresh_run_items (
+    run_id VARCHAR(32) REFERENCES refresh_runs(id) ON DELETE CASCADE,
+    repo_id INTEGER NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    error TEXT,
+    updated_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (run_id, repo_id)
+);
+
 -- Create indexes for performance
 CREATE INDEX IF NOT EXISTS idx_page_views_created_at ON page_views(created_at);
 CREATE INDEX IF NOT EXISTS idx_page_views_session_id ON page_views(session_id);
@@ -164,8 +207,16 @@ CREATE INDEX IF NOT EXISTS idx_analytics_events_created_at ON analytics_events(c
 CREATE INDEX IF NOT EXISTS idx_analytics_events_session_id ON analytics_events(session_id);
 CREATE INDEX IF NOT EXISTS idx_repositories_priority ON repositories(priority DESC);
 CREATE INDEX IF NOT EXISTS idx_repositories_is_visible ON repositories(is_visible);
+CREATE INDEX IF NOT EXISTS idx_repositories_keyset ON repositories(
+    priority DESC, (COALESCE(github_updated_at, '-infinity')) DESC, id DESC
+) WHERE is_visible = true;
+CREATE INDEX IF NOT EXISTS idx_repositories_technologies ON repositories USING GIN (technologies jsonb_path_ops);
+CREATE INDEX IF NOT EXISTS idx_repositories_project_type ON repositories USING GIN (project_type jsonb_path_ops);
+CREATE INDEX IF NOT EXISTS idx_repositories_topics ON repositories USING GIN (topics);
+CREATE INDEX IF NOT EXISTS idx_repositories_language ON repositories(language);
 CREATE INDEX IF NOT EXISTS idx_admin_sessions_token ON admin_sessions(token);
 CREATE INDEX IF NOT EXISTS idx_admin_sessions_expires ON admin_sessions(expires_at);
+CREATE INDEX IF NOT EXISTS idx_refresh_runs_started_at ON refresh_runs(started_at);
 """
 
 # Migrations to apply after table creation
@@ -204,6 +255,86 @@ BEGIN
         RAISE NOTICE 'Could not auto-populate category from project_type: %', SQLERRM;
     END;
 END $$;
+
+-- Incremental sync watermark (GitHub pushed_at)
+ALTER TABLE repositories ADD COLUMN IF NOT EXISTS github_pushed_at TIMESTAMPTZ;
+
+-- Change detection: hash of the synced content, unchanged rows are not rewritten
+ALTER TABLE repositories ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64);
+ALTER TABLE refresh_runs ADD COLUMN IF NOT EXISTS changed_count INTEGER DEFAULT 0;
+
+-- Architecture details (older databases were created without them)
+ALTER TABLE repositories ADD COLUMN IF NOT EXISTS architecture TEXT;
+ALTER TABLE repositories ADD COLUMN IF NOT EXISTS system_components JSONB DEFAULT '[]';
+ALTER TABLE repositories ADD COLUMN IF NOT EXISTS core_principles JSONB DEFAULT '[]';
+ALTER TABLE repositories ADD COLUMN IF NOT EXISTS auth_flow JSONB DEFAULT '[]';
+ALTER TABLE repositories ADD COLUMN IF NOT EXISTS data_models JSONB DEFAULT '[]';
+ALTER TABLE repositories ADD COLUMN IF NOT EXISTS technical_challenges JSONB DEFAULT '[]';
+ALTER TABLE repositories ADD COLUMN IF NOT EXISTS key_achievements JSONB DEFAULT '[]';
+ALTER TABLE repositories ADD COLUMN IF NOT EXISTS code_snippets JSONB DEFAULT '[]';
+
+-- Server-side category filter (category column is added by the migration above)
+CREATE INDEX IF NOT EXISTS idx_repositories_category ON repositories(category);
+
+-- Full-text search: stored tsvector maintained by Postgres on every write.
+-- 'simple' config (no stemming) so Korean tokens are indexed as-is.
+ALTER TABLE repositories ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(name, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(subtitle, '') || ' ' ||
+        coalesce(jsonb_path_query_array(technologies, '$[*].name')::text, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce(description, '')), 'C') ||
+    setweight(to_tsvector('simple', coalesce(detailed_description, '') || ' ' ||
+        coalesce(challenges, '') || ' ' || coalesce(achievements, '')), 'D')
+) STORED;
+CREATE INDEX IF NOT EXISTS idx_repositories_search ON repositories USING GIN (search_vector);
+
+-- Aggregate portfolio statistics (visible repos), refreshed concurrently after
+-- each sync. kind: language | technology | category | status | total
+CREATE MATERIALIZED VIEW IF NOT EXISTS repository_stats AS
+WITH visible AS (
+    SELECT id, languages, technologies, category, status, lines_of_code, commit_count
+    FROM repositories
+    WHERE is_visible = true
+)
+SELECT 'language' AS kind, lang.key AS key, COUNT(*) AS repo_count,
+       SUM((lang.value)::numeric)::bigint AS total_bytes,
+       NULL::bigint AS lines_of_code, NULL::bigint AS commit_count
+FROM visible,
+     jsonb_each(CASE WHEN jsonb_typeof(languages) = 'object' THEN languages ELSE '{}' END) AS lang
+WHERE jsonb_typeof(lang.value) = 'number'
+GROUP BY lang.key
+UNION ALL
+SELECT 'technology', tech->>'name', COUNT(DISTINCT id), NULL, NULL, NULL
+FROM visible,
+     jsonb_array_elements(CASE WHEN jsonb_typeof(technologies) = 'array' THEN technologies ELSE '[]' END) AS tech
+WHERE tech->>'name' IS NOT NULL
+GROUP BY tech->>'name'
+UNION ALL
+SELECT 'category', COALESCE(category, '기타'), COUNT(*), NULL, NULL, NULL
+FROM visible
+GROUP BY COALESCE(category, '기타')
+UNION ALL
+SELECT 'status', COALESCE(status, 'completed'), COUNT(*), NULL, NULL, NULL
+FROM visible
+GROUP BY COALESCE(status, 'completed')
+UNION ALL
+SELECT 'total', 'all', COUNT(*), NULL,
+       COALESCE(SUM(lines_of_code), 0)::bigint, COALESCE(SUM(commit_count), 0)::bigint
+FROM visible;
+
+-- Required by REFRESH MATERIALIZED VIEW CONCURRENTLY
+CREATE UNIQUE INDEX IF NOT EXISTS idx_repository_stats_kind_key ON repository_stats(kind, key);
+
+-- Optional fuzzy title matching (skipped if pg_trgm can't be installed)
+DO $$
+BEGIN
+    CREATE EXTENSION IF NOT EXISTS pg_trgm;
+    CREATE INDEX IF NOT EXISTS idx_repositories_title_trgm ON repositories
+        USING GIN ((coalesce(title, '') || ' ' || name) gin_trgm_ops);
+EXCEPTION
+    WHEN OTHERS THEN
+        RAISE NOTICE 'pg_trgm unavailable, fuzzy search disabled: %', SQLERRM;
+END $$;
 """
 
 
@@ -222,6 +353,30 @@ async def create_tables(pool: asyncpg.Pool) -> None:
             raise
 
 
+def _encode_jsonb(value) -> bytes:
+    # jsonb binary format: version byte (1) followed by the JSON text
+    return b"\x01" + orjson.dumps(value)
+
+
+def _decode_jsonb(data: bytes):
+    return orjson.loads(memoryview(data)[1:])
+
+
+async def _init_connection(conn: asyncpg.Connection) -> None:
+    """Exchange json/jsonb values as Python objects (orjson) on every pooled connection.
+    
+    Binary format so the codecs also apply to copy_records_to_table.
+    """
+    await conn.set_type_codec(
+        "jsonb", schema="pg_catalog", format="binary",
+        encoder=_encode_jsonb, decoder=_decode_jsonb,
+    )
+    await conn.set_type_codec(
+        "json", schema="pg_catalog", format="binary",
+        encoder=orjson.dumps, decoder=orjson.loads,
+    )
+
+
 async def init_db() -> None:
     """Initialize database connection pool."""
     global _pool
@@ -242,6 +397,7 @@ async def init_db() -> None:
             max_size=10,
             ssl=ssl_setting,
             command_timeout=60,
+            init=_init_connection,
         )
         print("Database connection pool initialized successfully!")
         
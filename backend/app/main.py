@@ -7,7 +7,13 @@ from fastapi.staticfiles import StaticFiles
 
 from app.config import get_settings
 from app.database import init_db, close_db, get_pool
-from app.routers import repos, auth, analytics, upload, settings, project_requests, ai_writer
+from app.routers import repos, auth, analytics, upload, settings, project_requests, ai_writer, github
+from app.services.analytics_ingest import analytics_ingest
+from app.services.cache_bus import cache_bus
+from app.services.github import github_service
+from app.services.refresh_jobs import refresh_job_manager
+from app.services.snapshot import snapshot_exporter
+from app.services.webhook import repo_resync_debouncer
 
 logger = logging.getLogger(__name__)
 
@@ -58,8 +64,17 @@ async def lifespan(app: FastAPI):
     # Startup
     await init_db()
     await ensure_admin_exists()
+    await cache_bus.start()
+    await github_service.start()
+    analytics_ingest.start()
     yield
     # Shutdown
+    await refresh_job_manager.close()
+    await repo_resync_debouncer.close()
+    await snapshot_exporter.close()
+    await analytics_ingest.close()
+    await github_service.close()
+    await cache_bus.close()
     await close_db()
 
 
@@ -94,6 +109,7 @@ def create_app() -> FastAPI:
     app.include_router(settings.router, prefix="/api")
     app.include_router(project_requests.router, prefix="/api")
     app.include_router(ai_writer.router, prefix="/api")
+    app.include_router(github.router, prefix="/api")
     
     # 정적 파일 서빙 (업로드된 이미지)
     if UPLOAD_DIR.exists():
@@ -1,11 +1,10 @@
-import json
 from fastapi import APIRouter, HTTPException, Depends, Request
 from datetime import datetime, timedelta
 from typing import Optional
-from user_agents import parse
 
 from app.database import get_pool
 from app.routers.auth import get_current_user
+from app.services.analytics_ingest import analytics_ingest
 
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
@@ -35,152 +34,30 @@ def format_duration(seconds: Optional[float]) -> str:
 
 @router.post("/collect")
 async def collect_analytics(request: Request):
-    """Analytics 데이터 수집 (공개 엔드포인트)"""
+    """Analytics 데이터 수집 (공개 엔드포인트)
+    
+    버퍼에 넣고 바로 반환합니다. DB 쓰기는 analytics_ingest 가
+    배치로 처리합니다 (COPY + 세션 일괄 upsert).
+    """
     try:
         data = await request.json()
-        pool = get_pool()
-        
-        # User-Agent 파싱
-        user_agent_str = request.headers.get("user-agent", "")
-        user_agent = parse(user_agent_str)
-        
-        device_type = "mobile" if user_agent.is_mobile else ("tablet" if user_agent.is_tablet else "desktop")
-        browser = user_agent.browser.family or "Unknown"
-        os = user_agent.os.family or "Unknown"
-        
-        # IP에서 위치 정보 (간단히 처리)
-        # 실제로는 ip-api.com 등 외부 서비스 사용 가능
-        country = None
-        city = None
-        
-        async with pool.acquire() as conn:
-            event_type = data.get("type")
-            
-            if event_type == "pageview":
-                # 페이지뷰 저장
-                await conn.execute(
-                    """
-                    INSERT INTO page_views (
-                        session_id, visitor_id, page_url, page_title, referrer,
-                        device_type, browser, os, screen_width, screen_height,
-                        country, city
-                    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
-                    """,
-                    data.get("sessionId"),
-                    data.get("visitorId"),
-                    data.get("url"),
-                    data.get("title"),
-                    data.get("referrer"),
-                    device_type,
-                    browser,
-                    os,
-                    data.get("screen", {}).get("width"),
-                    data.get("screen", {}).get("height"),
-                    country,
-                    city
-                )
-                
-                # 세션 업데이트 또는 생성
-                session_id = data.get("sessionId")
-                existing = await conn.fetchrow(
-                    "SELECT id FROM sessions WHERE id = $1",
-                    session_id
-                )
-                
-                if existing:
-                    await conn.execute(
-                        """
-                        UPDATE sessions 
-                        SET page_views = page_views + 1,
-                            exit_page = $2,
-                            is_bounce = FALSE
-                        WHERE id = $1
-                        """,
-                        session_id,
-                        data.get("url")
-                    )
-                else:
-                    utm = data.get("utm", {})
-                    await conn.execute(
-                        """
-                        INSERT INTO sessions (
-                            id, visitor_id, entry_page, exit_page,
-                            utm_source, utm_medium, utm_campaign
-                        ) VALUES ($1, $2, $3, $3, $4, $5, $6)
-                        """,
-                        session_id,
-                        data.get("visitorId"),
-                        data.get("url"),
-                        utm.get("source"),
-                        utm.get("medium"),
-                        utm.get("campaign")
-                    )
-            
-            elif event_type == "event":
-                # 커스텀 이벤트 저장
-                event_data = data.get("data")
-                event_data_json = json.dumps(event_data) if event_data else None
-                await conn.execute(
-                    """
-                    INSERT INTO analytics_events (
-                        session_id, visitor_id, event_name, event_data, page_url
-                    ) VALUES ($1, $2, $3, $4, $5)
-                    """,
-                    data.get("sessionId"),
-                    data.get("visitorId"),
-                    data.get("name"),
-                    event_data_json,
-                    data.get("url")
-                )
-                
-                # 참여 이벤트면 이탈 아님으로 처리
-                engaging_events = ["scroll_depth", "click", "form_submit"]
-                if data.get("name") in engaging_events:
-                    await conn.execute(
-                        "UPDATE sessions SET is_bounce = FALSE WHERE id = $1",
-                        data.get("sessionId")
-                    )
-            
-            elif event_type == "leave":
-                # 페이지 이탈 처리
-                await conn.execute(
-                    """
-                    UPDATE sessions 
-                    SET ended_at = NOW(),
-                        duration_seconds = $2,
-                        exit_page = $3
-                    WHERE id = $1
-                    """,
-                    data.get("sessionId"),
-                    data.get("duration"),
-                    data.get("url")
-                )
-                
-                # 이탈 이벤트 저장
-                leave_event_data = json.dumps({
-                    "duration": data.get("duration"),
-                    "activeTime": data.get("activeTime"),
-                    "scrollDepth": data.get("scrollDepth")
-                })
-                await conn.execute(
-                    """
-                    INSERT INTO analytics_events (
-                        session_id, visitor_id, event_name, event_data, page_url
-                    ) VALUES ($1, $2, 'page_leave', $3, $4)
-                    """,
-                    data.get("sessionId"),
-                    data.get("visitorId"),
-                    leave_event_data,
-                    data.get("url")
-                )
+        if not isinstance(data, dict):
+            return {"success": False}
         
-        return {"success": True}
+        queued = analytics_ingest.enqueue(data, request.headers.get("user-agent", ""))
+        return {"success": queued}
     
     except Exception as e:
         print(f"[Analytics] Error: {e}")
         return {"success": False}
 
 
+@router.get("/ingest")
+async def get_ingest_stats(user: dict = Depends(get_current_user)):
+    """Analytics 수집 버퍼 상태 (관리자 전용)"""
+    return analytics_ingest.stats()
+
+
 @router.get("/stats")
 async def get_stats(
     period: str = "7d",
@@ -0,0 +1,108 @@
+import logging
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+
+from app.config import get_settings
+from app.routers.auth import get_current_user
+from app.services.github import github_service
+from app.services.github_cache import github_response_cache
+from app.services.repository import repository_service
+from app.services.snapshot import snapshot_exporter
+from app.services.webhook import (
+    PAYLOAD_CONTENT_TYPES, parse_payload, repo_resync_debouncer, verify_signature
+)
+
+logger = logging.getLogger(__name__)
+router = APIRouter(tags=["github"])
+
+# Webhook events that can change what the portfolio shows for a repository
+RESYNC_EVENTS = {"push", "repository", "public"}
+
+
+@router.post("/github/webhook")
+async def github_webhook(
+    request: Request,
+    x_github_event: Optional[str] = Header(None),
+    x_hub_signature_256: Optional[str] = Header(None),
+):
+    """
+    Receive GitHub webhook deliveries and resync only the affected repository.
+    
+    Deliveries are verified with GITHUB_WEBHOOK_SECRET (HMAC SHA-256).
+    Both the ``application/json`` and ``application/x-www-form-urlencoded``
+    content types are accepted. Bursts of events for the same repository
+    are debounced into one resync.
+    """
+    settings = get_settings()
+    
+    if not settings.github_webhook_secret:
+        raise HTTPException(status_code=503, detail="Webhook secret not configured")
+    
+    body = await request.body()
+    if not verify_signature(settings.github_webhook_secret, body, x_hub_signature_256):
+        raise HTTPException(status_code=403, detail="Invalid signature")
+    
+    if x_github_event == "ping":
+        return {"message": "pong"}
+    
+    if x_github_event not in RESYNC_EVENTS:
+        return {"message": f"Ignored event: {x_github_event}"}
+    
+    content_type = (request.headers.get("content-type") or "").split(";")[0].strip().lower()
+    if content_type not in PAYLOAD_CONTENT_TYPES:
+        raise HTTPException(status_code=415, detail=f"Unsupported content type: {content_type}")
+    
+    try:
+        payload = parse_payload(body, content_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid payload: {e}")
+    repository = payload.get("repository") or {}
+    full_name = repository.get("full_name")
+    
+    if not full_name:
+        raise HTTPException(status_code=400, detail="Missing repository in payload")
+    
+    # Deleted repositories are removed right away instead of resynced
+    if x_github_event == "repository" and payload.get("action") == "deleted":
+        await repository_service.delete(repository["id"])
+        snapshot_exporter.schedule()
+        return {"message": f"Deleted {full_name}"}
+    
+    repo_resync_debouncer.schedule(full_name)
+    return {"message": f"Resync scheduled for {full_name}"}
+
+
+@router.get("/admin/github/connections")
+async def get_connection_stats(user: dict = Depends(get_current_user)):
+    """
+    Get connection reuse metrics for the shared GitHub HTTP client (admin only).
+    """
+    return github_service.connection_stats()
+
+
+@router.get("/admin/github/rate-limit")
+async def get_rate_limit(user: dict = Depends(get_current_user)):
+    """
+    Get the remaining GitHub rate-limit budget and scheduler state (admin only).
+    
+    Budgets are taken from the headers of the most recent GitHub responses.
+    """
+    return github_service.scheduler.status()
+
+
+@router.get("/admin/github/cache")
+async def get_cache_stats(user: dict = Depends(get_current_user)):
+    """
+    Get conditional request cache hit/miss counters (admin only).
+    """
+    return github_response_cache.stats()
+
+
+@router.delete("/admin/github/cache")
+async def clear_cache(user: dict = Depends(get_current_user)):
+    """
+    Clear the GitHub response cache, forcing full downloads on next refresh (admin only).
+    """
+    deleted = await github_response_cache.clear()
+    return {"success": True, "deleted": deleted}
@@ -1,14 +1,18 @@
-import json
 import logging
-from typing import Optional, List
+from typing import Optional, List, Union
 
-from fastapi import APIRouter, HTTPException, Header, BackgroundTasks, Depends
+from fastapi import APIRouter, HTTPException, Header, Depends, Query
+from fastapi.responses import Response
 from pydantic import BaseModel
 
 from app.config import get_settings
-from app.schemas.repo import Repository, RepositoryListResponse, RefreshResponse
-from app.services.github import github_service
-from app.services.repository import repository_service
+from app.schemas.repo import (
+    Repository, RepositoryListResponse, RepositoryPageResponse,
+    RepositorySearchResponse, RepositoryStatsResponse, RefreshResponse, RefreshJobResponse
+)
+from app.services.refresh_jobs import RefreshConflictError, refresh_job_manager
+from app.services.repository import EncodedPayload, encode_payload, repository_service
+from app.services.snapshot import snapshot_exporter
 from app.routers.auth import get_current_user
 from app.database import get_pool
 
@@ -39,28 +43,119 @@ class UpdateCategoryRequest(BaseModel):
     category: str  # 웹, 모바일, 데스크탑 프로그램, 기타
 
 
-@router.get("/repos", response_model=RepositoryListResponse)
-async def get_repositories():
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against a strong ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return etag in tags or f"W/{etag}" in tags
+
+
+def _cached_json_response(payload: EncodedPayload, if_none_match: Optional[str]) -> Response:
+    """Serve pre-encoded JSON, or 304 if the client already has this version."""
+    headers = {
+        "ETag": payload.etag,
+        "Cache-Control": f"public, max-age={get_settings().repos_cache_max_age}, must-revalidate",
+    }
+    if _etag_matches(if_none_match, payload.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=payload.body, media_type="application/json", headers=headers)
+
+
+# Full listing or projected page depending on the query (see docstring)
+@router.get("/repos", response_model=Union[RepositoryListResponse, RepositoryPageResponse])
+async def get_repositories(
+    fields: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=100),
+    cursor: Optional[str] = None,
+    category: Optional[str] = None,
+    language: Optional[str] = None,
+    technology: Optional[str] = None,
+    project_type: Optional[str] = None,
+    topic: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+):
     """
     Get cached repository list (visible only, for frontend).
     
     Returns repositories sorted by priority (highest first),
-    then by last updated date.
+    then by last updated date. The body is pre-encoded and carries
+    an ETag; ``If-None-Match`` revalidation returns 304.
+    
+    Passing ``fields``, ``limit`` or ``cursor`` switches to a projected,
+    keyset-paginated listing (RepositoryPageResponse): ``fields`` is
+    ``summary`` (default), ``all`` or a comma-separated column list, and
+    ``next_cursor`` from one page is passed as ``cursor`` for the next.
+    
+    ``category``, ``language``, ``technology``, ``project_type`` and
+    ``topic`` filter the paginated listing in SQL (exact match).
     """
-    try:
-        repos = await repository_service.get_all(include_hidden=False)
-        last_updated = await repository_service.get_last_updated()
+    filters = {
+        key: value for key, value in {
+            "category": category,
+            "language": language,
+            "technology": technology,
+            "project_type": project_type,
+            "topic": topic,
+        }.items() if value
+    }
+    
+    if filters or fields is not None or limit is not None or cursor is not None:
+        try:
+            columns = repository_service.resolve_fields(fields)
+            repos, next_cursor = await repository_service.list_page(
+                columns, limit or 24, cursor, filters
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
-        return RepositoryListResponse(
-            repositories=repos,
-            total=len(repos),
-            last_updated=last_updated,
-        )
+        page = RepositoryPageResponse(repositories=repos, next_cursor=next_cursor)
+        return _cached_json_response(encode_payload(page), if_none_match)
+    
+    try:
+        payload = await repository_service.get_list_payload()
+        return _cached_json_response(payload, if_none_match)
     except Exception as e:
         logger.error(f"Failed to get repositories: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch repositories")
 
 
+# Registered before /repos/{repo_id} so "search"/"stats" aren't parsed as ids
+@router.get("/repos/search", response_model=RepositorySearchResponse)
+async def search_repositories(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=50),
+):
+    """
+    Search visible repositories by title, description, challenges,
+    achievements and technology names. Results are ranked by relevance.
+    """
+    try:
+        repos = await repository_service.search(q, limit)
+    except Exception as e:
+        logger.error(f"Repository search failed: {e}")
+        raise HTTPException(status_code=500, detail="Failed to search repositories")
+    
+    return RepositorySearchResponse(query=q, repositories=repos, total=len(repos))
+
+
+@router.get("/repos/stats", response_model=RepositoryStatsResponse)
+async def get_repository_stats():
+    """
+    Get aggregate statistics over visible repositories: bytes per language,
+    repo counts per technology/category/status and LOC/commit totals.
+    
+    Served from a materialized view refreshed after each sync.
+    """
+    try:
+        return await repository_service.get_stats()
+    except Exception as e:
+        logger.error(f"Failed to get repository stats: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch repository stats")
+
+
 @router.get("/admin/repos", response_model=RepositoryListResponse)
 async def get_repositories_admin(user: dict = Depends(get_current_user)):
     """
@@ -84,29 +179,18 @@ async def get_repositories_admin(user: dict = Depends(get_current_user)):
 
 
 @router.get("/repos/{repo_id}", response_model=Repository)
-async def get_repository(repo_id: int):
-    """Get a single repository by ID."""
-    repo = await repository_service.get_by_id(repo_id)
+async def get_repository(repo_id: int, if_none_match: Optional[str] = Header(None)):
+    """Get a single repository by ID (pre-encoded, supports ETag revalidation)."""
+    payload = await repository_service.get_payload(repo_id)
     
-    if not repo:
+    if not payload:
         raise HTTPException(status_code=404, detail="Repository not found")
     
-    return repo
+    return _cached_json_response(payload, if_none_match)
 
 
-@router.post("/repos/refresh", response_model=RefreshResponse)
-async def refresh_repositories(
-    background_tasks: BackgroundTasks,
-    authorization: Optional[str] = Header(None),
-):
-    """
-    Trigger repository data refresh from GitHub.
-    
-    This endpoint fetches all repositories from GitHub,
-    retrieves portfolio metadata if available, and updates the cache.
-    
-    Accepts either API_SECRET or admin Bearer token for authentication.
-    """
+async def verify_refresh_authorization(authorization: Optional[str]) -> None:
+    """Accept either API_SECRET or an admin Bearer token."""
     from app.services import auth as auth_service
     
     settings = get_settings()
@@ -128,34 +212,65 @@ async def refresh_repositories(
     
     if not is_api_secret_valid and not is_admin_token_valid:
         raise HTTPException(status_code=403, detail="Invalid authorization")
-    
+
+
+def _start_refresh(full: bool):
+    """Start (or join) a refresh; 409 with the running job's id on a full/incremental clash."""
     try:
-        # Fetch from GitHub and update cache
-        repos = await github_service.fetch_all_repos_with_meta()
-        updated_count = await repository_service.upsert_many(repos)
-        
-        return RefreshResponse(
-            message="Refresh completed successfully",
-            updated_count=updated_count,
-        )
-    except Exception as e:
-        logger.error(f"Failed to refresh repositories: {e}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to refresh repositories: {str(e)}"
-        )
+        return refresh_job_manager.start(full=full)
+    except RefreshConflictError as e:
+        raise HTTPException(status_code=409, detail={"message": str(e), "job_id": e.job.id})
+
+
+@router.post("/repos/refresh", response_model=RefreshResponse)
+async def refresh_repositories(
+    full: bool = False,
+    authorization: Optional[str] = Header(None),
+):
+    """
+    Trigger repository data refresh from GitHub.
+    
+    This endpoint fetches all repositories from GitHub,
+    retrieves portfolio metadata if available, and updates the cache.
+    
+    By default only repositories whose updated_at/pushed_at changed since
+    the last sync are refetched. Pass ``full=true`` to refetch everything.
+    If a refresh is already running, this waits for that one instead
+    (409 if ``full=true`` but the running refresh is incremental).
+    ``status`` is ``skipped`` when another worker was already syncing.
+    
+    Accepts either API_SECRET or admin Bearer token for authentication.
+    """
+    await verify_refresh_authorization(authorization)
+    
+    job = await refresh_job_manager.wait(_start_refresh(full))
+    
+    if job.status == "failed":
+        raise HTTPException(status_code=500, detail=job.message)
+    
+    return RefreshResponse(
+        status=job.status,
+        message=job.message or "Refresh completed successfully",
+        updated_count=job.updated_count,
+        changed_count=job.changed_count,
+        unchanged_count=job.updated_count - job.changed_count,
+        skipped_count=job.skipped_count,
+        errors=job.errors,
+        job_id=job.id,
+    )
 
 
 @router.post("/repos/refresh/async")
 async def refresh_repositories_async(
-    background_tasks: BackgroundTasks,
+    full: bool = False,
     authorization: Optional[str] = Header(None),
 ):
     """
     Trigger repository refresh in background.
     
     Returns immediately and processes in background.
-    Useful for GitHub Actions cron jobs.
+    Useful for GitHub Actions cron jobs. Incremental unless ``full=true``.
+    Poll ``/repos/refresh/jobs/{job_id}`` for progress.
     """
     settings = get_settings()
     
@@ -168,17 +283,54 @@ async def refresh_repositories_async(
         if token != settings.api_secret:
             raise HTTPException(status_code=403, detail="Invalid authorization")
     
-    async def refresh_task():
-        try:
-            repos = await github_service.fetch_all_repos_with_meta()
-            await repository_service.upsert_many(repos)
-            logger.info(f"Background refresh completed: {len(repos)} repos updated")
-        except Exception as e:
-            logger.error(f"Background refresh failed: {e}")
+    job = _start_refresh(full)
+    
+    return {"message": "Refresh started in background", "job_id": job.id}
+
+
+@router.get("/repos/refresh/jobs/{job_id}", response_model=RefreshJobResponse)
+async def get_refresh_job(
+    job_id: str,
+    authorization: Optional[str] = Header(None),
+):
+    """Get status and progress of a refresh job ("current" for the latest job)."""
+    await verify_refresh_authorization(authorization)
     
-    background_tasks.add_task(refresh_task)
+    job = refresh_job_manager.current() if job_id == "current" else refresh_job_manager.get(job_id)
     
-    return {"message": "Refresh started in background"}
+    if job:
+        return RefreshJobResponse(**job.to_dict())
+    
+    # Not started in this worker - look up the persisted run
+    run = await refresh_job_manager.get_run(job_id) if job_id != "current" else None
+    if not run:
+        raise HTTPException(status_code=404, detail="Refresh job not found")
+    
+    return RefreshJobResponse(**run)
+
+
+@router.post("/repos/refresh/jobs/{job_id}/resume", response_model=RefreshJobResponse)
+async def resume_refresh_job(
+    job_id: str,
+    authorization: Optional[str] = Header(None),
+):
+    """
+    Resume a failed or interrupted refresh run in background.
+    
+    Repositories already stored by the run are skipped.
+    If another refresh is running, its status is returned instead.
+    """
+    await verify_refresh_authorization(authorization)
+    
+    try:
+        job = await refresh_job_manager.resume(job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Refresh job not found")
+    
+    return RefreshJobResponse(**job.to_dict())
 
 
 @router.put("/repos/{repo_id}/screenshots")
@@ -200,15 +352,15 @@ async def update_screenshots(
         if not exists:
             raise HTTPException(status_code=404, detail="Repository not found")
         
-        # 스크린샷 JSON 변환
-        screenshots_json = json.dumps([
+        # 스크린샷 데이터 (jsonb 코덱이 직렬화)
+        screenshots_data = [
             {
                 "url": s.url,
                 "caption": s.caption,
                 "order": s.order
             }
             for s in request.screenshots
-        ])
+        ]
         
         # 업데이트
         await conn.execute(
@@ -219,9 +371,12 @@ async def update_screenshots(
             WHERE id = $1
             """,
             repo_id,
-            screenshots_json
+            screenshots_data
         )
     
+    await repository_service.notify_changed()
+    snapshot_exporter.schedule()
+    
     return {"success": True, "count": len(request.screenshots)}
 
 
@@ -256,6 +411,9 @@ async def update_cover_image(
             request.cover_image
         )
     
+    await repository_service.notify_changed()
+    snapshot_exporter.schedule()
+    
     return {"success": True, "cover_image": request.cover_image}
 
 
@@ -290,6 +448,11 @@ async def update_visibility(
             request.is_visible
         )
     
+    await repository_service.notify_changed()
+    # repository_stats 뷰 갱신 (공개 여부와 카테고리가 집계에 반영됨)
+    await repository_service.refresh_stats()
+    snapshot_exporter.schedule()
+    
     return {"success": True, "is_visible": request.is_visible}
 
 
@@ -332,4 +495,9 @@ async def update_category(
             request.category
         )
     
+    await repository_service.notify_changed()
+    # repository_stats 뷰 갱신 (공개 여부와 카테고리가 집계에 반영됨)
+    await repository_service.refresh_stats()
+    snapshot_exporter.schedule()
+    
     return {"success": True, "category": request.category}
@@ -6,6 +6,11 @@ from pydantic import BaseModel
 
 from app.database import get_pool
 from app.routers.auth import get_current_user
+from app.schemas.settings import SNSLinksResponse
+from app.services import cache_bus as cache_keys
+from app.services.cache_bus import cache_bus
+from app.services.site_settings import site_settings_service
+from app.services.snapshot import snapshot_exporter
 
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["settings"])
@@ -25,14 +30,6 @@ class UpdateSettingsRequest(BaseModel):
     settings: List[SettingItem]
 
 
-class SNSLinksResponse(BaseModel):
-    threads: Optional[str] = None
-    youtube: Optional[str] = None
-    github: Optional[str] = None
-    linkedin: Optional[str] = None
-    email: Optional[str] = None
-
-
 # Public endpoint - no auth required
 @router.get("/settings/sns", response_model=SNSLinksResponse)
 async def get_sns_links():
@@ -40,25 +37,7 @@ async def get_sns_links():
     Get SNS links for public display.
     No authentication required.
     """
-    pool = get_pool()
-    
-    async with pool.acquire() as conn:
-        rows = await conn.fetch(
-            """
-            SELECT key, value FROM site_settings 
-            WHERE key LIKE 'sns_%' OR key = 'contact_email'
-            """
-        )
-        
-        settings = {row['key']: row['value'] for row in rows}
-        
-        return SNSLinksResponse(
-            threads=settings.get('sns_threads', ''),
-            youtube=settings.get('sns_youtube', ''),
-            github=settings.get('sns_github', ''),
-            linkedin=settings.get('sns_linkedin', ''),
-            email=settings.get('contact_email', '')
-        )
+    return await site_settings_service.get_sns_links()
 
 
 # Admin endpoints - require auth
@@ -106,8 +85,11 @@ async def update_settings(
                 item.description
             )
             updated += 1
-        
-        return {"success": True, "updated": updated}
+    
+    await cache_bus.publish(cache_keys.SETTINGS)
+    snapshot_exporter.schedule()
+    
+    return {"success": True, "updated": updated}
 
 
 @router.get("/admin/settings/{key}")
@@ -148,5 +130,8 @@ async def delete_setting(key: str, user: dict = Depends(get_current_user)):
         
         if result == "DELETE 0":
             raise HTTPException(status_code=404, detail="Setting not found")
-        
-        return {"success": True, "deleted": key}
+    
+    await cache_bus.publish(cache_keys.SETTINGS)
+    snapshot_exporter.schedule()
+    
+    return {"success": True, "deleted": key}
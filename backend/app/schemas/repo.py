@@ -149,6 +149,7 @@ class Repository(BaseModel):
     topics: list[str] = []
     github_created_at: Optional[datetime] = None
     github_updated_at: Optional[datetime] = None
+    github_pushed_at: Optional[datetime] = None
     
     # Custom metadata
     title: Optional[str] = None
@@ -210,8 +211,62 @@ class RepositoryListResponse(BaseModel):
     last_updated: Optional[datetime] = None
 
 
+class RepositoryPageResponse(BaseModel):
+    """Response model for a projected, keyset-paginated repository list."""
+    repositories: list[dict]
+    next_cursor: Optional[str] = None
+
+
+class RepositorySearchResponse(BaseModel):
+    """Response model for repository search (summary fields plus rank)."""
+    query: str
+    repositories: list[dict]
+    total: int
+
+
+class StatCount(BaseModel):
+    """One aggregate bucket (language, technology, category or status)."""
+    name: str
+    repo_count: int
+    total_bytes: Optional[int] = None  # languages only
+
+
+class RepositoryStatsResponse(BaseModel):
+    """Aggregate statistics over visible repositories."""
+    languages: list[StatCount] = []
+    technologies: list[StatCount] = []
+    categories: list[StatCount] = []
+    statuses: list[StatCount] = []
+    total_repos: int = 0
+    total_lines_of_code: int = 0
+    total_commits: int = 0
+
+
 class RefreshResponse(BaseModel):
     """Response model for refresh endpoint."""
+    status: str = "completed"  # completed, skipped (another worker was syncing)
     message: str
     updated_count: int
+    changed_count: int = 0  # Rows actually rewritten (content hash changed)
+    unchanged_count: int = 0  # Refetched but identical, not rewritten
+    skipped_count: int = 0
+    errors: list[str] = []
+    job_id: Optional[str] = None
+
+
+class RefreshJobResponse(BaseModel):
+    """Response model for refresh job status."""
+    job_id: str
+    status: str  # running, completed, failed, skipped
+    message: Optional[str] = None
+    full: bool = False
+    done: int = 0
+    total: int = 0
+    updated_count: int = 0
+    changed_count: int = 0
+    unchanged_count: int = 0
+    skipped_count: int = 0
     errors: list[str] = []
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    elapsed_seconds: float = 0
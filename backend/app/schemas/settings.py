@@ -0,0 +1,10 @@
+from pydantic import BaseModel
+from typing import Optional
+
+
+class SNSLinksResponse(BaseModel):
+    threads: Optional[str] = None
+    youtube: Optional[str] = None
+    github: Optional[str] = None
+    linkedin: Optional[str] = None
+    email: Optional[str] = None
@@ -67,7 +67,7 @@ class AIWriterService:
     
     async def get_portfolio_summary(self) -> str:
         """Get a summary of all portfolio projects for AI context."""
-        repos = await repository_service.get_all(include_hidden=False)
+        repos = await repository_service.get_all(include_hidden=False, include_details=True)
         
         if not repos:
             return "포트폴리오 프로젝트가 없습니다."
@@ -0,0 +1,335 @@
+"""Buffered analytics ingestion: beacons are queued and written in batches."""
+import asyncio
+import logging
+import math
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Optional
+
+import asyncpg
+import orjson
+from user_agents import parse
+
+from app.config import get_settings
+from app.database import get_connection
+
+logger = logging.getLogger(__name__)
+
+PAGE_VIEW_COLUMNS = [
+    "session_id", "visitor_id", "page_url", "page_title", "referrer",
+    "device_type", "browser", "os", "screen_width", "screen_height",
+    "country", "city", "created_at",
+]
+EVENT_COLUMNS = ["session_id", "visitor_id", "event_name", "event_data", "page_url", "created_at"]
+
+# 참여 이벤트면 이탈 아님으로 처리
+ENGAGING_EVENTS = {"scroll_depth", "click", "form_submit"}
+
+# integer 컬럼 범위 (벗어나면 COPY가 배치 전체를 거부함)
+INT4_MIN, INT4_MAX = -2**31, 2**31 - 1
+
+# Failures that say nothing about the beacons themselves: fail the batch, don't bisect
+CONNECTION_ERRORS = (OSError, asyncio.TimeoutError, asyncpg.InterfaceError, asyncpg.PostgresConnectionError)
+
+
+@lru_cache(maxsize=1024)
+def parse_user_agent(user_agent_str: str) -> tuple[str, str, str]:
+    """User-Agent -> (device_type, browser, os). Cached: beacons repeat the same few UAs."""
+    user_agent = parse(user_agent_str)
+    device_type = "mobile" if user_agent.is_mobile else ("tablet" if user_agent.is_tablet else "desktop")
+    return device_type, user_agent.browser.family or "Unknown", user_agent.os.family or "Unknown"
+
+
+def _text(value: Any, max_length: Optional[int] = None) -> Optional[str]:
+    """Coerce client-supplied values to text that fits the column.
+    
+    NUL characters are stripped: Postgres text can't store them.
+    """
+    if value is None:
+        return None
+    text = value if isinstance(value, str) else str(value)
+    text = text.replace("\x00", "")
+    return text[:max_length] if max_length else text
+
+
+def _int(value: Any) -> Optional[int]:
+    """Coerce a client-supplied number to an int clamped to the integer column range."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return min(max(int(round(value)), INT4_MIN), INT4_MAX)
+
+
+def _clean_json(value: Any) -> Any:
+    """Strip NULs from strings/keys (jsonb rejects \u0000) and drop ints orjson can't encode."""
+    if isinstance(value, str):
+        return value.replace("\x00", "")
+    if isinstance(value, dict):
+        return {_clean_json(str(key)): _clean_json(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_clean_json(item) for item in value]
+    if isinstance(value, int) and not isinstance(value, bool) and not -2**63 <= value < 2**64:
+        return None
+    return value
+
+
+def _json(value: Any) -> Any:
+    """Clean event data and make sure it encodes, so a bad beacon fails on its own."""
+    value = _clean_json(value)
+    orjson.dumps(value)
+    return value
+
+
+class AnalyticsIngestBuffer:
+    """Bounded in-memory queue of analytics beacons with a background writer.
+    
+    ``/analytics/collect`` only enqueues. The writer flushes every
+    ``analytics_flush_interval`` seconds or ``analytics_batch_size`` beacons,
+    COPYing page views and events and applying session changes with a few
+    set-based statements, all on one connection in one transaction.
+    When the queue is full new beacons are dropped (and counted).
+    """
+    
+    def __init__(self):
+        settings = get_settings()
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=settings.analytics_queue_size)
+        self._batch_size = max(1, settings.analytics_batch_size)
+        self._flush_interval = settings.analytics_flush_interval
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.enqueued = 0
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+    
+    def enqueue(self, data: dict, user_agent: str) -> bool:
+        """Queue a beacon. Returns False if the buffer is full and it was dropped."""
+        try:
+            self._queue.put_nowait((datetime.utcnow(), data, user_agent))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        self.enqueued += 1
+        return True
+    
+    def start(self) -> None:
+        """Start the background writer."""
+        self._stopping = False
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+    
+    async def close(self, timeout: float = 10.0) -> None:
+        """Stop accepting work and flush everything still queued."""
+        self._stopping = True
+        if self._task is None:
+            return
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Analytics drain timed out, {self._queue.qsize()} beacons lost")
+        self._task = None
+    
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+        }
+    
+    async def _run(self) -> None:
+        while not (self._stopping and self._queue.empty()):
+            batch = await self._collect_batch()
+            if batch:
+                await self._flush(batch)
+    
+    async def _collect_batch(self) -> list[tuple]:
+        """Wait for the first beacon, then gather more until the size or time limit."""
+        try:
+            first = await asyncio.wait_for(self._queue.get(), self._flush_interval)
+        except asyncio.TimeoutError:
+            return []
+        
+        batch = [first]
+        deadline = time.monotonic() + self._flush_interval
+        while len(batch) < self._batch_size:
+            if self._stopping:
+                # Draining: take whatever is left without waiting
+                if self._queue.empty():
+                    break
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+    
+    def _build(self, batch: list[tuple]) -> tuple[list, list, dict, set, dict]:
+        """Split a batch into page view rows, event rows and per-session changes."""
+        page_views = []
+        events = []
+        sessions: dict[str, dict] = {}  # sessions touched by page views
+        engaged: set[str] = set()
+        leaves: dict[str, dict] = {}
+        exits: dict[str, str] = {}  # last exit page per session, in arrival order
+        
+        for at, data, user_agent_str in batch:
+            try:
+                event_type = data.get("type")
+                session_id = _text(data.get("sessionId"), 255)
+                visitor_id = _text(data.get("visitorId"), 255)
+                url = _text(data.get("url"))
+                
+                if event_type == "pageview":
+                    device_type, browser, os = parse_user_agent(user_agent_str)
+                    screen = data.get("screen") or {}
+                    page_views.append((
+                        session_id, visitor_id, url,
+                        _text(data.get("title"), 500), _text(data.get("referrer")),
+                        device_type[:50], browser[:100], os[:100],
+                        _int(screen.get("width")), _int(screen.get("height")),
+                        None, None, at,
+                    ))
+                    if session_id:
+                        exits[session_id] = url
+                        session = sessions.get(session_id)
+                        if session is None:
+                            utm = data.get("utm") or {}
+                            sessions[session_id] = {
+                                "visitor_id": visitor_id,
+                                "entry_page": url,
+                                "page_views": 1,
+                                "utm_source": _text(utm.get("source"), 255),
+                                "utm_medium": _text(utm.get("medium"), 255),
+                                "utm_campaign": _text(utm.get("campaign"), 255),
+                                "started_at": at,
+                            }
+                        else:
+                            session["page_views"] += 1
+                
+                elif event_type == "event":
+                    name = _text(data.get("name"), 255)
+                    events.append((session_id, visitor_id, name, _json(data.get("data") or None), url, at))
+                    if session_id and name in ENGAGING_EVENTS:
+                        engaged.add(session_id)
+                
+                elif event_type == "leave":
+                    events.append((session_id, visitor_id, "page_leave", _json({
+                        "duration": data.get("duration"),
+                        "activeTime": data.get("activeTime"),
+                        "scrollDepth": data.get("scrollDepth"),
+                    }), url, at))
+                    if session_id:
+                        exits[session_id] = url
+                        leaves[session_id] = {"duration": _int(data.get("duration")), "ended_at": at}
+            except Exception as e:
+                logger.debug(f"Skipping malformed analytics beacon: {e}")
+        
+        for session_id, session in sessions.items():
+            session["exit_page"] = exits[session_id]
+        for session_id, leave in leaves.items():
+            leave["exit_page"] = exits[session_id]
+        
+        return page_views, events, sessions, engaged, leaves
+    
+    async def _flush(self, batch: list[tuple]) -> None:
+        """Write a batch; if the database rejects it, bisect to isolate the bad beacons.
+        
+        Each half is retried in its own transaction, so one malformed beacon
+        costs O(log n) extra round trips instead of the whole batch.
+        """
+        try:
+            await self._write(batch)
+            self.written += len(batch)
+        except CONNECTION_ERRORS as e:
+            self.failed += len(batch)
+            logger.error(f"Failed to flush {len(batch)} analytics beacons: {e}")
+        except Exception as e:
+            if len(batch) == 1:
+                self.failed += 1
+                logger.warning(f"Dropping analytics beacon rejected by the database: {e}")
+                return
+            middle = len(batch) // 2
+            await self._flush(batch[:middle])
+            await self._flush(batch[middle:])
+    
+    async def _write(self, batch: list[tuple]) -> None:
+        page_views, events, sessions, engaged, leaves = self._build(batch)
+        
+        async with get_connection() as conn:
+            async with conn.transaction():
+                if page_views:
+                    await conn.copy_records_to_table(
+                        "page_views", records=page_views, columns=PAGE_VIEW_COLUMNS
+                    )
+                if events:
+                    await conn.copy_records_to_table(
+                        "analytics_events", records=events, columns=EVENT_COLUMNS
+                    )
+                
+                # 세션 업데이트 또는 생성 (세션당 한 행으로 합쳐서)
+                if sessions:
+                    ids = list(sessions)
+                    await conn.execute(
+                        """
+                        INSERT INTO sessions (
+                            id, visitor_id, entry_page, exit_page, page_views, is_bounce,
+                            utm_source, utm_medium, utm_campaign, started_at
+                        )
+                        SELECT id, visitor_id, entry_page, exit_page, page_views, page_views <= 1,
+                               utm_source, utm_medium, utm_campaign, started_at
+                        FROM unnest(
+                            $1::text[], $2::text[], $3::text[], $4::text[], $5::int[],
+                            $6::text[], $7::text[], $8::text[], $9::timestamp[]
+                        ) AS s(id, visitor_id, entry_page, exit_page, page_views,
+                               utm_source, utm_medium, utm_campaign, started_at)
+                        ON CONFLICT (id) DO UPDATE SET
+                            page_views = sessions.page_views + EXCLUDED.page_views,
+                            exit_page = EXCLUDED.exit_page,
+                            is_bounce = FALSE
+                        """,
+                        ids,
+                        *[
+                            [sessions[session_id][key] for session_id in ids]
+                            for key in (
+                                "visitor_id", "entry_page", "exit_page", "page_views",
+                                "utm_source", "utm_medium", "utm_campaign", "started_at",
+                            )
+                        ],
+                    )
+                
+                if engaged:
+                    await conn.execute(
+                        "UPDATE sessions SET is_bounce = FALSE WHERE id = ANY($1::text[])",
+                        list(engaged)
+                    )
+                
+                # 페이지 이탈 처리
+                if leaves:
+                    ids = list(leaves)
+                    await conn.execute(
+                        """
+                        UPDATE sessions
+                        SET ended_at = l.ended_at,
+                            duration_seconds = l.duration,
+                            exit_page = l.exit_page
+                        FROM unnest($1::text[], $2::int[], $3::text[], $4::timestamp[])
+                            AS l(id, duration, exit_page, ended_at)
+                        WHERE sessions.id = l.id
+                        """,
+                        ids,
+                        [leaves[session_id]["duration"] for session_id in ids],
+                        [leaves[session_id]["exit_page"] for session_id in ids],
+                        [leaves[session_id]["ended_at"] for session_id in ids],
+                    )
+
+
+# Singleton instance
+analytics_ingest = AnalyticsIngestBuffer()
@@ -0,0 +1,115 @@
+"""Cross-worker cache invalidation over Postgres LISTEN/NOTIFY."""
+import asyncio
+import logging
+from typing import Callable, Optional
+
+import asyncpg
+
+from app.database import get_connection, get_pool
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "portfolio_cache"
+
+# Cache keys
+REPOSITORIES = "repositories"
+SETTINGS = "settings"
+
+
+class CacheInvalidationBus:
+    """Broadcasts cache invalidations to every uvicorn worker.
+    
+    ``publish(key)`` drops the matching local caches immediately and sends
+    ``NOTIFY portfolio_cache, '<key>'``; every other worker listening on the
+    channel drops its caches for that key when the notification arrives.
+    """
+    
+    RECONNECT_DELAY = 5.0
+    
+    def __init__(self):
+        self._handlers: dict[str, list[Callable[[], None]]] = {}
+        self._conn: Optional[asyncpg.Connection] = None
+        self._reconnect_task: Optional[asyncio.Task] = None
+        self._closing = False
+    
+    def subscribe(self, key: str, handler: Callable[[], None]) -> None:
+        """Register a handler that drops local cache entries for a key."""
+        self._handlers.setdefault(key, []).append(handler)
+    
+    def _dispatch(self, key: str) -> None:
+        for handler in self._handlers.get(key, []):
+            try:
+                handler()
+            except Exception as e:
+                logger.error(f"Cache invalidation handler failed for '{key}': {e}")
+    
+    def _dispatch_all(self) -> None:
+        for key in self._handlers:
+            self._dispatch(key)
+    
+    async def publish(self, key: str) -> None:
+        """Invalidate a cache key in this worker and notify all other workers."""
+        self._dispatch(key)
+        try:
+            async with get_connection() as conn:
+                await conn.execute("SELECT pg_notify($1, $2)", CHANNEL, key)
+        except Exception as e:
+            logger.error(f"Failed to publish cache invalidation '{key}': {e}")
+    
+    def _on_notify(self, conn, pid: int, channel: str, payload: str) -> None:
+        # Our own notifications were already applied locally in publish()
+        if self._conn is not None and pid == self._conn.get_server_pid():
+            return
+        self._dispatch(payload)
+    
+    def _on_terminate(self, conn) -> None:
+        if self._closing:
+            return
+        logger.warning("Cache invalidation listener lost its connection, reconnecting")
+        self._conn = None
+        # Notifications may have been missed - drop everything
+        self._dispatch_all()
+        self._reconnect_task = asyncio.create_task(self._reconnect())
+    
+    async def _listen(self) -> None:
+        conn = await get_pool().acquire()
+        try:
+            await conn.add_listener(CHANNEL, self._on_notify)
+            conn.add_termination_listener(self._on_terminate)
+        except Exception:
+            await get_pool().release(conn)
+            raise
+        self._conn = conn
+    
+    async def _reconnect(self) -> None:
+        while not self._closing:
+            try:
+                await self._listen()
+                self._dispatch_all()
+                logger.info("Cache invalidation listener reconnected")
+                return
+            except Exception as e:
+                logger.error(f"Cache invalidation listener reconnect failed: {e}")
+                await asyncio.sleep(self.RECONNECT_DELAY)
+    
+    async def start(self) -> None:
+        """Start listening for invalidations (holds one pooled connection)."""
+        self._closing = False
+        await self._listen()
+        logger.info(f"Listening for cache invalidations on '{CHANNEL}'")
+    
+    async def close(self) -> None:
+        """Stop listening and return the connection to the pool."""
+        self._closing = True
+        if self._reconnect_task:
+            self._reconnect_task.cancel()
+        if self._conn is not None:
+            try:
+                await self._conn.remove_listener(CHANNEL, self._on_notify)
+            finally:
+                await get_pool().release(self._conn)
+                self._conn = None
+
+
+# Singleton instance
+cache_bus = CacheInvalidationBus()
@@ -1,13 +1,18 @@
+import asyncio
 import base64
 import json
 import logging
-from datetime import datetime
-from typing import Optional
+import re
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional, Union
 
 import httpx
 
 from app.config import get_settings
 from app.schemas.repo import PortfolioMeta, Repository, Screenshot
+from app.services.github_cache import github_response_cache
+from app.services.github_rate_limit import RateLimitScheduler
+from app.services.meta_cache import portfolio_meta_cache
 
 logger = logging.getLogger(__name__)
 
@@ -16,8 +21,21 @@ class GitHubService:
     """Service for interacting with GitHub API."""
     
     BASE_URL = "https://api.github.com"
+    GRAPHQL_URL = "https://api.github.com/graphql"
     RAW_URL = "https://raw.githubusercontent.com"
     
+    # Fields fetched per repository in a GraphQL batch (aliased per repo)
+    GRAPHQL_REPO_FIELDS = """
+        defaultBranchRef {
+            target { ... on Commit { history { totalCount } } }
+        }
+        languages(first: 100) { edges { size node { name } } }
+        mentionableUsers { totalCount }
+        metaJson: object(expression: "HEAD:portfolio/meta.json") {
+            ... on Blob { oid text }
+        }
+    """
+    
     def __init__(self):
         settings = get_settings()
         self.username = settings.github_username
@@ -27,6 +45,121 @@ class GitHubService:
         }
         if settings.github_token:
             self.headers["Authorization"] = f"Bearer {settings.github_token}"
+        
+        # Shared HTTP client (created in app lifespan, see start/close)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._stats = {"requests": 0, "new_connections": 0}
+        
+        # Throttles/retries every request based on the rate-limit budget
+        self.scheduler = RateLimitScheduler(
+            max_concurrency=settings.github_max_connections,
+            low_watermark=settings.github_rate_limit_low_watermark,
+            max_retries=settings.github_max_retries,
+            max_wait=settings.github_max_rate_limit_wait,
+        )
+    
+    def _create_client(self) -> httpx.AsyncClient:
+        """Create a pooled HTTP/2 client with keep-alive connections."""
+        settings = get_settings()
+        return httpx.AsyncClient(
+            http2=True,
+            limits=httpx.Limits(
+                max_connections=settings.github_max_connections,
+                max_keepalive_connections=settings.github_max_connections,
+                keepalive_expiry=settings.github_keepalive_expiry,
+            ),
+            event_hooks={"request": [self._attach_trace]},
+        )
+    
+    async def start(self) -> None:
+        """Create the shared HTTP client used for all GitHub calls."""
+        if self._client is None:
+            self._client = self._create_client()
+            logger.info("GitHub HTTP client started")
+    
+    async def close(self) -> None:
+        """Close the shared HTTP client and release pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            logger.info(f"GitHub HTTP client closed: {self.connection_stats()}")
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Get the shared HTTP client (created lazily when used outside the app, e.g. scripts)."""
+        if self._client is None:
+            self._client = self._create_client()
+        return self._client
+    
+    async def _attach_trace(self, request: httpx.Request) -> None:
+        """Count requests and attach a trace callback to detect new connections."""
+        self._stats["requests"] += 1
+        request.extensions["trace"] = self._trace
+    
+    async def _trace(self, event_name: str, info: dict) -> None:
+        """httpcore trace callback - a TCP connect means no pooled connection was reused."""
+        if event_name == "connection.connect_tcp.complete":
+            self._stats["new_connections"] += 1
+    
+    async def _get(self, url: str, params: Optional[dict] = None) -> httpx.Response:
+        """GET a GitHub API URL as a conditional request.
+        
+        Sends the cached ETag / Last-Modified validators and, on 304 Not Modified,
+        replays the cached body as a regular 200 response so callers don't need
+        to know about the cache. 304s don't count against the GitHub rate limit.
+        """
+        cache_key = str(httpx.URL(url, params=params))
+        cached = await github_response_cache.get(cache_key)
+        
+        headers = dict(self.headers)
+        if cached:
+            if cached["etag"]:
+                headers["If-None-Match"] = cached["etag"]
+            if cached["last_modified"]:
+                headers["If-Modified-Since"] = cached["last_modified"]
+        
+        response = await self.scheduler.request(
+            lambda: self.client.get(url, headers=headers, params=params)
+        )
+        
+        if response.status_code == 304 and cached:
+            github_response_cache.record_hit()
+            replay_headers = {"Content-Type": "application/json"}
+            if cached["link"]:
+                replay_headers["Link"] = cached["link"]
+            return httpx.Response(
+                200,
+                content=cached["body"].encode("utf-8"),
+                headers=replay_headers,
+                request=response.request,
+            )
+        
+        github_response_cache.record_miss()
+        
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if response.status_code == 200 and (etag or last_modified):
+            await github_response_cache.set(
+                cache_key,
+                response.text,
+                etag=etag,
+                last_modified=last_modified,
+                link=response.headers.get("Link"),
+            )
+        
+        return response
+    
+    def connection_stats(self) -> dict:
+        """Get connection reuse metrics for the shared HTTP client."""
+        requests = self._stats["requests"]
+        new_connections = self._stats["new_connections"]
+        reused = max(requests - new_connections, 0)
+        return {
+            "requests": requests,
+            "new_connections": new_connections,
+            "reused_requests": reused,
+            "reuse_ratio": round(reused / requests, 3) if requests else 0.0,
+        }
     
     async def fetch_user_repos(self) -> list[dict]:
         """Fetch all repositories for the configured user (including private if token has 'repo' scope)."""
@@ -35,155 +168,232 @@ class GitHubService:
         page = 1
         per_page = 100
         
-        async with httpx.AsyncClient() as client:
-            while True:
-                # If we have a token, use /user/repos to get ALL repos (including private)
-                # Otherwise, use /users/{username}/repos for public only
-                if settings.github_token:
-                    url = f"{self.BASE_URL}/user/repos"
-                    params = {
-                        "visibility": "all",  # public, private, and internal
-                        "affiliation": "owner",  # only repos owned by user
-                        "sort": "updated",
-                        "direction": "desc",
-                        "per_page": per_page,
-                        "page": page,
-                    }
-                else:
-                    url = f"{self.BASE_URL}/users/{self.username}/repos"
-                    params = {
-                        "type": "owner",
-                        "sort": "updated",
-                        "direction": "desc",
-                        "per_page": per_page,
-                        "page": page,
-                    }
-                
-                response = await client.get(
-                    url, headers=self.headers, params=params
-                )
-                
-                if response.status_code != 200:
-                    logger.error(f"Failed to fetch repos: {response.status_code} - {response.text}")
-                    break
-                
-                data = response.json()
-                if not data:
-                    break
-                
-                repos.extend(data)
-                
-                if len(data) < per_page:
-                    break
-                page += 1
-        
-        logger.info(f"Fetched {len(repos)} repositories (token: {'yes' if settings.github_token else 'no'})")
-        return repos
-    
-    async def fetch_commit_count(self, owner: str, repo: str) -> int:
-        """Fetch total commit count for a repository using contributors API."""
-        async with httpx.AsyncClient() as client:
-            # Use contributors API to sum all contributions
-            url = f"{self.BASE_URL}/repos/{owner}/{repo}/contributors"
-            params = {"per_page": 100, "anon": "true"}
+        while True:
+            # If we have a token, use /user/repos to get ALL repos (including private)
+            # Otherwise, use /users/{username}/repos for public only
+            if settings.github_token:
+                url = f"{self.BASE_URL}/user/repos"
+                params = {
+                    "visibility": "all",  # public, private, and internal
+                    "affiliation": "owner",  # only repos owned by user
+                    "sort": "updated",
+                    "direction": "desc",
+                    "per_page": per_page,
+                    "page": page,
+                }
+            else:
+                url = f"{self.BASE_URL}/users/{self.username}/repos"
+                params = {
+                    "type": "owner",
+                    "sort": "updated",
+                    "direction": "desc",
+                    "per_page": per_page,
+                    "page": page,
+                }
             
-            response = await client.get(url, headers=self.headers, params=params)
+            response = await self._get(url, params=params)
             
             if response.status_code != 200:
-                # Fallback: try to get from commit count header
-                commits_url = f"{self.BASE_URL}/repos/{owner}/{repo}/commits"
-                commits_response = await client.get(
-                    commits_url, 
-                    headers=self.headers, 
-                    params={"per_page": 1}
-                )
-                
-                if commits_response.status_code == 200:
-                    # Parse Link header to get total count
-                    link_header = commits_response.headers.get("Link", "")
-                    if 'rel="last"' in link_header:
-                        import re
-                        match = re.search(r'page=(\d+)>; rel="last"', link_header)
-                        if match:
-                            return int(match.group(1))
-                return 0
+                logger.error(f"Failed to fetch repos: {response.status_code} - {response.text}")
+                break
             
-            contributors = response.json()
-            total_commits = sum(c.get("contributions", 0) for c in contributors)
-            return total_commits
-    
-    async def fetch_code_stats(self, owner: str, repo: str) -> dict:
-        """Fetch code statistics (languages/bytes) for a repository."""
-        async with httpx.AsyncClient() as client:
-            url = f"{self.BASE_URL}/repos/{owner}/{repo}/languages"
+            data = response.json()
+            if not data:
+                break
             
-            response = await client.get(url, headers=self.headers)
-            
-            if response.status_code != 200:
-                return {"total_bytes": 0, "estimated_lines": 0, "languages": {}}
+            repos.extend(data)
             
-            languages = response.json()
-            total_bytes = sum(languages.values())
+            if len(data) < per_page:
+                break
+            page += 1
+        
+        logger.info(f"Fetched {len(repos)} repositories (token: {'yes' if settings.github_token else 'no'})")
+        return repos
+    
+    async def fetch_repo(self, owner: str, repo: str) -> Optional[dict]:
+        """Fetch a single repository (same shape as the /user/repos listing entries)."""
+        url = f"{self.BASE_URL}/repos/{owner}/{repo}"
+        
+        response = await self._get(url)
+        
+        if response.status_code != 200:
+            logger.warning(f"Failed to fetch repo {owner}/{repo}: {response.status_code}")
+            return None
+        
+        return response.json()
+    
+    @staticmethod
+    def _raise_unexpected(response: httpx.Response, what: str, expected=(200, 404)) -> None:
+        """Raise unless the status is an expected answer (found / not found).
+        
+        Treating a transient 403/5xx as "missing" would upsert a degraded row
+        together with the new sync watermark, and incremental syncs would then
+        never refetch it. Raising turns it into a per-repo error instead.
+        """
+        if response.status_code not in expected:
+            raise RuntimeError(f"Failed to fetch {what}: {response.status_code}")
+    
+    async def fetch_contributor_stats(self, owner: str, repo: str) -> dict:
+        """Fetch total commit count and contributor count from one contributors listing.
+        
+        Pages through /contributors (following Link headers past the first 100)
+        once and derives both values from the same response.
+        """
+        url = f"{self.BASE_URL}/repos/{owner}/{repo}/contributors"
+        params = {"per_page": 100, "anon": "true"}
+        
+        contributors = []
+        while url:
+            response = await self._get(url, params=params)
             
-            # Estimate lines of code (rough: ~40 bytes per line on average)
-            estimated_lines = total_bytes // 40
+            if response.status_code in (204, 404):
+                # Empty repository (204) or nothing to list (404)
+                break
             
-            return {
-                "total_bytes": total_bytes,
-                "estimated_lines": estimated_lines,
-                "languages": languages,
-            }
-    
-    async def fetch_contributor_count(self, owner: str, repo: str) -> int:
-        """Fetch number of contributors for a repository."""
-        async with httpx.AsyncClient() as client:
-            url = f"{self.BASE_URL}/repos/{owner}/{repo}/contributors"
-            params = {"per_page": 1, "anon": "true"}
+            # 403 here means the contributor list is too large for the API;
+            # rate-limit 403s were already raised by the scheduler
+            if response.status_code == 403:
+                return {
+                    "commit_count": await self._fetch_commit_count_fallback(owner, repo),
+                    "contributor_count": 1,
+                }
             
-            response = await client.get(url, headers=self.headers, params=params)
+            self._raise_unexpected(response, f"contributors of {repo}", expected=(200,))
             
-            if response.status_code != 200:
-                return 1
+            page = response.json()
+            if isinstance(page, list):
+                contributors.extend(page)
             
+            # Next page URL already carries the query params
+            url = response.links.get("next", {}).get("url")
+            params = None
+        
+        return {
+            "commit_count": sum(c.get("contributions", 0) for c in contributors),
+            "contributor_count": len(contributors) or 1,
+        }
+    
+    async def _fetch_commit_count_fallback(self, owner: str, repo: str) -> int:
+        """Estimate commit count from the commits listing's last page number."""
+        commits_url = f"{self.BASE_URL}/repos/{owner}/{repo}/commits"
+        commits_response = await self._get(
+            commits_url, 
+            params={"per_page": 1}
+        )
+        
+        # 409: empty repository
+        self._raise_unexpected(commits_response, f"commits of {repo}", expected=(200, 404, 409))
+        
+        if commits_response.status_code == 200:
             # Parse Link header to get total count
-            link_header = response.headers.get("Link", "")
+            link_header = commits_response.headers.get("Link", "")
             if 'rel="last"' in link_header:
-                import re
                 match = re.search(r'page=(\d+)>; rel="last"', link_header)
                 if match:
                     return int(match.group(1))
-            
-            # If no pagination, count the response
-            contributors = response.json()
-            return len(contributors) if isinstance(contributors, list) else 1
+        return 0
+    
+    async def fetch_code_stats(self, owner: str, repo: str) -> dict:
+        """Fetch code statistics (languages/bytes) for a repository."""
+        url = f"{self.BASE_URL}/repos/{owner}/{repo}/languages"
+        
+        response = await self._get(url)
+        
+        self._raise_unexpected(response, f"languages of {repo}")
+        if response.status_code == 404:
+            return {"total_bytes": 0, "estimated_lines": 0, "languages": {}}
+        
+        languages = response.json()
+        total_bytes = sum(languages.values())
+        
+        # Estimate lines of code (rough: ~40 bytes per line on average)
+        estimated_lines = total_bytes // 40
+        
+        return {
+            "total_bytes": total_bytes,
+            "estimated_lines": estimated_lines,
+            "languages": languages,
+        }
+    
+    async def fetch_portfolio_meta_sha(self, owner: str, repo: str) -> Optional[str]:
+        """Fetch only the blob SHA of portfolio/meta.json (None if it doesn't exist).
+        
+        Lists the portfolio/ directory, which returns entry SHAs without file
+        contents, so callers can check the meta cache before downloading the body.
+        """
+        url = f"{self.BASE_URL}/repos/{owner}/{repo}/contents/portfolio"
+        
+        response = await self._get(url)
+        
+        self._raise_unexpected(response, f"portfolio/ of {repo}")
+        if response.status_code == 404:
+            return None
+        
+        entries = response.json()
+        if not isinstance(entries, list):
+            return None
+        
+        for entry in entries:
+            if entry.get("name") == "meta.json" and entry.get("type") == "file":
+                return entry.get("sha")
+        return None
     
     async def fetch_portfolio_meta(
-        self, owner: str, repo: str
+        self, owner: str, repo: str, sha: Optional[str] = None
     ) -> Optional[PortfolioMeta]:
-        """Fetch portfolio/meta.json from a repository if it exists."""
-        async with httpx.AsyncClient() as client:
-            url = f"{self.BASE_URL}/repos/{owner}/{repo}/contents/portfolio/meta.json"
-            
-            response = await client.get(url, headers=self.headers)
-            
-            if response.status_code == 404:
-                return None
+        """Fetch portfolio/meta.json from a repository if it exists.
+        
+        Parsed results are cached by blob SHA. If ``sha`` is already known
+        (e.g. from ``fetch_portfolio_meta_sha``) and cached, no request is made.
+        """
+        if sha:
+            cached = await portfolio_meta_cache.get(sha)
+            if cached is not None:
+                return cached
+        
+        url = f"{self.BASE_URL}/repos/{owner}/{repo}/contents/portfolio/meta.json"
+        
+        response = await self._get(url)
+        
+        self._raise_unexpected(response, f"meta.json of {repo}")
+        if response.status_code == 404:
+            return None
+        
+        try:
+            content_data = response.json()
             
-            if response.status_code != 200:
-                logger.warning(
-                    f"Failed to fetch meta.json for {repo}: {response.status_code}"
-                )
-                return None
+            # Unchanged blob - skip decoding and parsing
+            blob_sha = content_data.get("sha")
+            if blob_sha:
+                cached = await portfolio_meta_cache.get(blob_sha)
+                if cached is not None:
+                    return cached
             
-            try:
-                content_data = response.json()
-                # GitHub returns base64 encoded content
-                content = base64.b64decode(content_data["content"]).decode("utf-8")
-                meta_dict = json.loads(content)
-                return self._parse_meta_json(meta_dict)
-            except Exception as e:
-                logger.error(f"Failed to parse meta.json for {repo}: {e}")
-                return None
+            # GitHub returns base64 encoded content
+            content = base64.b64decode(content_data["content"]).decode("utf-8")
+            meta_dict = json.loads(content)
+            meta = self._parse_meta_json(meta_dict)
+        except Exception as e:
+            logger.error(f"Failed to parse meta.json for {repo}: {e}")
+            return None
+        
+        if blob_sha:
+            await portfolio_meta_cache.set(blob_sha, meta)
+        return meta
+    
+    async def fetch_portfolio_meta_if_changed(
+        self, owner: str, repo: str
+    ) -> Optional[PortfolioMeta]:
+        """Fetch portfolio/meta.json, downloading the body only when its SHA is new.
+        
+        The directory listing is cheap and returns the blob SHA; if that SHA is
+        already in the meta cache the cached meta is returned without fetching
+        or parsing meta.json again.
+        """
+        sha = await self.fetch_portfolio_meta_sha(owner, repo)
+        if sha is None:
+            return None
+        return await self.fetch_portfolio_meta(owner, repo, sha=sha)
     
     def _parse_meta_json(self, data: dict) -> PortfolioMeta:
         """Parse meta.json structure into PortfolioMeta."""
@@ -247,6 +457,42 @@ class GitHubService:
             })
         return result
     
+    @staticmethod
+    def _parse_github_datetime(value: Optional[str]) -> Optional[datetime]:
+        """Parse an ISO 8601 timestamp from the GitHub API (e.g. 2024-01-01T00:00:00Z)."""
+        if not value:
+            return None
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    
+    @staticmethod
+    def _to_utc_naive(value: Optional[datetime]) -> Optional[datetime]:
+        """Normalize a datetime to naive UTC so API and DB timestamps compare equal."""
+        if value is None or value.tzinfo is None:
+            return value
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    
+    def has_changed(self, github_repo: dict, stored: Optional[dict]) -> bool:
+        """Check whether a repo listing differs from the stored sync watermarks.
+        
+        Args:
+            github_repo: Repository entry from the /user/repos listing.
+            stored: Stored watermarks (github_updated_at, github_pushed_at) for the
+                    repo, or None if it has never been synced.
+        """
+        if not stored or stored.get("github_pushed_at") is None:
+            return True
+        
+        for api_field, db_field in (
+            ("updated_at", "github_updated_at"),
+            ("pushed_at", "github_pushed_at"),
+        ):
+            api_value = self._to_utc_naive(
+                self._parse_github_datetime(github_repo.get(api_field))
+            )
+            if api_value != self._to_utc_naive(stored.get(db_field)):
+                return True
+        return False
+    
     def merge_repo_data(
         self, 
         github_repo: dict, 
@@ -260,16 +506,9 @@ class GitHubService:
         repo_name = github_repo["name"]
         
         # Parse GitHub dates
-        github_created = None
-        github_updated = None
-        if github_repo.get("created_at"):
-            github_created = datetime.fromisoformat(
-                github_repo["created_at"].replace("Z", "+00:00")
-            )
-        if github_repo.get("updated_at"):
-            github_updated = datetime.fromisoformat(
-                github_repo["updated_at"].replace("Z", "+00:00")
-            )
+        github_created = self._parse_github_datetime(github_repo.get("created_at"))
+        github_updated = self._parse_github_datetime(github_repo.get("updated_at"))
+        github_pushed = self._parse_github_datetime(github_repo.get("pushed_at"))
         
         # Base data from GitHub
         repo_data = {
@@ -283,6 +522,7 @@ class GitHubService:
             "topics": github_repo.get("topics", []),
             "github_created_at": github_created,
             "github_updated_at": github_updated,
+            "github_pushed_at": github_pushed,
             "has_portfolio_meta": meta is not None,
             "cached_at": datetime.utcnow(),
             # GitHub API stats (can be overridden by meta.json)
@@ -354,44 +594,232 @@ class GitHubService:
         
         return Repository(**repo_data)
     
-    async def fetch_all_repos_with_meta(self) -> list[Repository]:
-        """Fetch all repos and their portfolio metadata with stats."""
-        github_repos = await self.fetch_user_repos()
-        repositories = []
+    async def fetch_repo_with_meta(self, github_repo: dict) -> Repository:
+        """Fetch portfolio metadata and stats for a single repo and merge them."""
+        owner = github_repo["owner"]["login"]
+        repo_name = github_repo["name"]
+        
+        # Metadata and stats are independent, so fetch them concurrently
+        meta, code_stats, contributor_stats = await asyncio.gather(
+            self.fetch_portfolio_meta_if_changed(owner, repo_name),
+            self.fetch_code_stats(owner, repo_name),
+            self.fetch_contributor_stats(owner, repo_name),
+        )
+        
+        # Merge data with stats
+        return self.merge_repo_data(
+            github_repo, 
+            meta,
+            code_stats=code_stats,
+            commit_count=contributor_stats["commit_count"],
+            contributor_count=contributor_stats["contributor_count"],
+        )
+    
+    def _build_graphql_batch_query(self, github_repos: list[dict]) -> tuple[str, dict]:
+        """Build one aliased GraphQL query (and variables) covering a batch of repos."""
+        params = []
+        selections = []
+        variables = {}
+        for i, github_repo in enumerate(github_repos):
+            params.append(f"$owner{i}: String!, $name{i}: String!")
+            selections.append(
+                f"r{i}: repository(owner: $owner{i}, name: $name{i}) {{"
+                f"{self.GRAPHQL_REPO_FIELDS}}}"
+            )
+            variables[f"owner{i}"] = github_repo["owner"]["login"]
+            variables[f"name{i}"] = github_repo["name"]
+        
+        query = f"query({', '.join(params)}) {{ {' '.join(selections)} }}"
+        return query, variables
+    
+    async def _parse_graphql_repo(self, github_repo: dict, node: dict) -> Repository:
+        """Convert one aliased GraphQL repository node into a merged Repository."""
+        # Commit count on the default branch (None for empty repositories)
+        commit_count = 0
+        branch = node.get("defaultBranchRef") or {}
+        history = (branch.get("target") or {}).get("history")
+        if history:
+            commit_count = history.get("totalCount", 0)
+        
+        # Language breakdown (same shape as the REST /languages endpoint)
+        languages = {
+            edge["node"]["name"]: edge["size"]
+            for edge in (node.get("languages") or {}).get("edges", [])
+        }
+        total_bytes = sum(languages.values())
+        code_stats = {
+            "total_bytes": total_bytes,
+            "estimated_lines": total_bytes // 40,
+            "languages": languages,
+        }
         
-        for github_repo in github_repos:
-            # Skip forks by default
-            if github_repo.get("fork", False):
+        # GraphQL has no contributors connection; mentionable users is the closest count
+        contributor_count = (node.get("mentionableUsers") or {}).get("totalCount") or 1
+        
+        meta = None
+        meta_blob = node.get("metaJson")
+        if meta_blob and meta_blob.get("oid"):
+            meta = await portfolio_meta_cache.get(meta_blob["oid"])
+        if meta is None and meta_blob and meta_blob.get("text"):
+            try:
+                meta = self._parse_meta_json(json.loads(meta_blob["text"]))
+            except Exception as e:
+                logger.error(f"Failed to parse meta.json for {github_repo['name']}: {e}")
+            else:
+                if meta_blob.get("oid"):
+                    await portfolio_meta_cache.set(meta_blob["oid"], meta)
+        
+        return self.merge_repo_data(
+            github_repo,
+            meta,
+            code_stats=code_stats,
+            commit_count=commit_count,
+            contributor_count=contributor_count,
+        )
+    
+    async def fetch_repos_with_meta_graphql(
+        self, github_repos: list[dict]
+    ) -> list[tuple[dict, Union[Repository, Exception]]]:
+        """Fetch metadata and stats for a batch of repos with a single GraphQL query.
+        
+        Returns:
+            List of (listing entry, merged repository or per-repo exception) pairs.
+        """
+        query, variables = self._build_graphql_batch_query(github_repos)
+        response = await self.scheduler.request(
+            lambda: self.client.post(
+                self.GRAPHQL_URL,
+                headers=self.headers,
+                json={"query": query, "variables": variables},
+            )
+        )
+        
+        if response.status_code != 200:
+            raise RuntimeError(
+                f"GraphQL batch failed: {response.status_code} - {response.text}"
+            )
+        
+        payload = response.json()
+        data = payload.get("data") or {}
+        
+        # Partial errors are reported per alias (path[0] is e.g. "r3")
+        alias_errors = {}
+        for error in payload.get("errors", []):
+            path = error.get("path") or []
+            if path:
+                alias_errors.setdefault(path[0], error.get("message", "unknown error"))
+        
+        results = []
+        for i, github_repo in enumerate(github_repos):
+            alias = f"r{i}"
+            node = data.get(alias)
+            if node is None:
+                message = alias_errors.get(alias, "repository not returned")
+                results.append((github_repo, RuntimeError(message)))
                 continue
+            try:
+                results.append((github_repo, await self._parse_graphql_repo(github_repo, node)))
+            except Exception as e:
+                results.append((github_repo, e))
+        
+        return results
+    
+    async def list_repos_to_sync(
+        self, sync_state: Optional[dict[int, dict]] = None
+    ) -> tuple[list[dict], int]:
+        """List the user's repositories that need to be synced.
+        
+        Args:
+            sync_state: Stored watermarks by repo id (see
+                        ``RepositoryService.get_sync_state``). When given, only
+                        repos whose ``updated_at``/``pushed_at`` changed are
+                        returned (incremental sync). When None, all repos are returned.
+        
+        Returns:
+            Tuple of (listing entries to sync, number of unchanged repos skipped).
+        """
+        # Skip forks by default
+        github_repos = [
+            r for r in await self.fetch_user_repos() if not r.get("fork", False)
+        ]
+        
+        skipped_count = 0
+        if sync_state is not None:
+            changed_repos = [
+                r for r in github_repos if self.has_changed(r, sync_state.get(r["id"]))
+            ]
+            skipped_count = len(github_repos) - len(changed_repos)
+            github_repos = changed_repos
+            logger.info(
+                f"Incremental sync: {len(github_repos)} changed, {skipped_count} unchanged"
+            )
+        
+        return github_repos, skipped_count
+    
+    async def iter_repos_with_meta(
+        self,
+        github_repos: list[dict],
+        concurrency: Optional[int] = None,
+    ) -> AsyncIterator[tuple[dict, Union[Repository, Exception]]]:
+        """Fetch metadata and stats for repos, yielding each as soon as it is merged.
+        
+        Repositories are fetched in parallel, bounded by ``concurrency``
+        (defaults to the ``github_fetch_concurrency`` setting). A failure in
+        one repository is yielded as an exception for that repo instead of
+        aborting the whole pipeline.
+        
+        With ``github_fetch_backend = "graphql"`` (requires a token), stats and
+        meta.json are fetched in GraphQL batches of ``github_graphql_batch_size``
+        repos instead of per-repo REST calls.
+        
+        Yields:
+            (listing entry, merged repository or exception) pairs in completion order.
+        """
+        settings = get_settings()
+        limit = concurrency or settings.github_fetch_concurrency
+        semaphore = asyncio.Semaphore(max(1, limit))
+        
+        use_graphql = settings.github_fetch_backend == "graphql"
+        if use_graphql and not settings.github_token:
+            logger.warning("GraphQL backend requires GITHUB_TOKEN, falling back to REST")
+            use_graphql = False
+        
+        if use_graphql:
+            batch_size = max(1, settings.github_graphql_batch_size)
+            batches = [
+                github_repos[i:i + batch_size]
+                for i in range(0, len(github_repos), batch_size)
+            ]
             
-            owner = github_repo["owner"]["login"]
-            repo_name = github_repo["name"]
-            
-            # Try to fetch portfolio metadata
-            meta = await self.fetch_portfolio_meta(owner, repo_name)
+            async def fetch_batch_bounded(batch: list[dict]):
+                async with semaphore:
+                    try:
+                        return await self.fetch_repos_with_meta_graphql(batch)
+                    except Exception as e:
+                        logger.error(f"Failed to fetch GraphQL batch: {e}")
+                        return [(github_repo, e) for github_repo in batch]
             
-            # Fetch additional stats from GitHub API
-            code_stats = await self.fetch_code_stats(owner, repo_name)
-            commit_count = await self.fetch_commit_count(owner, repo_name)
-            contributor_count = await self.fetch_contributor_count(owner, repo_name)
+            tasks = [asyncio.create_task(fetch_batch_bounded(b)) for b in batches]
+        else:
+            async def fetch_bounded(github_repo: dict):
+                async with semaphore:
+                    try:
+                        return [(github_repo, await self.fetch_repo_with_meta(github_repo))]
+                    except Exception as e:
+                        return [(github_repo, e)]
             
-            # Merge data with stats
-            repo = self.merge_repo_data(
-                github_repo, 
-                meta,
-                code_stats=code_stats,
-                commit_count=commit_count,
-                contributor_count=contributor_count,
-            )
-            repositories.append(repo)
-        
-        # Sort by priority (higher first), then by updated date
-        repositories.sort(
-            key=lambda r: (r.priority, r.github_updated_at or datetime.min),
-            reverse=True,
-        )
+            tasks = [asyncio.create_task(fetch_bounded(r)) for r in github_repos]
         
-        return repositories
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                for github_repo, result in await next_done:
+                    if isinstance(result, Exception):
+                        logger.error(f"Failed to fetch repo {github_repo['name']}: {result}")
+                    yield github_repo, result
+        finally:
+            # Consumer stopped early (error/cancel) - don't leave fetches running
+            for task in tasks:
+                task.cancel()
 
 
 # Singleton instance
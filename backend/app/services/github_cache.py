@@ -0,0 +1,93 @@
+"""Conditional request (ETag / Last-Modified) cache for GitHub API responses."""
+import logging
+from typing import Optional
+
+from app.database import get_connection
+
+logger = logging.getLogger(__name__)
+
+
+class GitHubResponseCache:
+    """Persistent cache of GitHub API responses keyed by request URL.
+    
+    Stores the validators (ETag / Last-Modified) and body of successful
+    responses so that later requests can be sent as conditional requests.
+    GitHub does not count 304 Not Modified responses against the rate limit,
+    so replaying the cached body on a 304 makes unchanged resources free.
+    """
+    
+    def __init__(self):
+        self._stats = {"hits": 0, "misses": 0, "stores": 0}
+    
+    async def get(self, url: str) -> Optional[dict]:
+        """Get the cached entry for a URL, or None if not cached."""
+        try:
+            async with get_connection() as conn:
+                row = await conn.fetchrow(
+                    """
+                    SELECT etag, last_modified, link, body
+                    FROM github_response_cache
+                    WHERE url = $1
+                    """,
+                    url
+                )
+        except Exception as e:
+            # Cache is best-effort; fall back to an unconditional request
+            logger.debug(f"GitHub cache lookup failed for {url}: {e}")
+            return None
+        
+        return dict(row) if row else None
+    
+    async def set(
+        self,
+        url: str,
+        body: str,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        link: Optional[str] = None,
+    ) -> None:
+        """Store a response body together with its validators."""
+        try:
+            async with get_connection() as conn:
+                await conn.execute(
+                    """
+                    INSERT INTO github_response_cache (url, etag, last_modified, link, body, cached_at)
+                    VALUES ($1, $2, $3, $4, $5, NOW())
+                    ON CONFLICT (url) DO UPDATE SET
+                        etag = EXCLUDED.etag,
+                        last_modified = EXCLUDED.last_modified,
+                        link = EXCLUDED.link,
+                        body = EXCLUDED.body,
+                        cached_at = NOW()
+                    """,
+                    url, etag, last_modified, link, body
+                )
+            self._stats["stores"] += 1
+        except Exception as e:
+            logger.debug(f"GitHub cache store failed for {url}: {e}")
+    
+    def record_hit(self) -> None:
+        """Record a 304 Not Modified served from the cache."""
+        self._stats["hits"] += 1
+    
+    def record_miss(self) -> None:
+        """Record a request that had to download the full response."""
+        self._stats["misses"] += 1
+    
+    def stats(self) -> dict:
+        """Get cache hit/miss counters since startup."""
+        total = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "hit_ratio": round(self._stats["hits"] / total, 3) if total else 0.0,
+        }
+    
+    async def clear(self) -> int:
+        """Delete all cached responses. Returns number of deleted entries."""
+        async with get_connection() as conn:
+            result = await conn.execute("DELETE FROM github_response_cache")
+            return int(result.split()[-1])
+
+
+# Singleton instance
+github_response_cache = GitHubResponseCache()
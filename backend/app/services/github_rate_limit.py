@@ -0,0 +1,261 @@
+"""Rate-limit-aware request scheduling for GitHub API calls."""
+import asyncio
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Transient server errors worth retrying
+RETRYABLE_STATUS_CODES = {500, 502, 503, 504}
+
+# Budgets that throttle the shared scheduler (REST and GraphQL calls)
+THROTTLED_RESOURCES = ("core", "graphql")
+
+
+class GitHubRateLimitError(RuntimeError):
+    """GitHub is still rate limiting a request after the scheduler gave up on it.
+    
+    Raised instead of returning the 403/429 response, so callers can't
+    mistake it for "not found" or empty data.
+    """
+    
+    def __init__(self, response: httpx.Response, retry_after: Optional[float] = None):
+        self.response = response
+        self.retry_after = retry_after
+        message = f"GitHub rate limit exceeded ({response.status_code}) for {response.request.url}"
+        if retry_after is not None:
+            message += f", retry in {retry_after:.0f}s"
+        super().__init__(message)
+
+
+class RateLimitScheduler:
+    """Throttles and retries GitHub requests based on rate-limit response headers.
+    
+    - Tracks ``X-RateLimit-*`` budgets per resource (core, graphql, search, ...).
+    - Scales the number of in-flight requests down as the core or GraphQL
+      budget drains.
+    - Pauses all requests on secondary rate limits (``Retry-After``) and when
+      the primary budget is exhausted until it resets.
+    - Retries transient failures with jittered exponential backoff.
+    - Raises ``GitHubRateLimitError`` when a request stays rate limited.
+    """
+    
+    def __init__(
+        self,
+        max_concurrency: int = 20,
+        low_watermark: int = 100,
+        max_retries: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        max_wait: float = 60.0,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.low_watermark = low_watermark
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_wait = max_wait  # Longest pause we accept before giving up on a request
+        
+        self._limits: dict[str, dict] = {}
+        self._paused_until = 0.0  # Epoch seconds
+        self._in_flight = 0
+        self._condition: Optional[asyncio.Condition] = None
+        self._stats = {"retries": 0, "throttled": 0, "secondary_limits": 0}
+    
+    @property
+    def _cond(self) -> asyncio.Condition:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+    
+    def allowed_concurrency(self) -> int:
+        """Get the current in-flight request limit derived from the remaining budget.
+        
+        Full concurrency while more than half the budget is left, then scaled
+        linearly down to a single request at the low watermark. The tightest
+        of the REST (``core``) and ``graphql`` budgets wins.
+        """
+        return min(
+            self._concurrency_for(self._limits.get(resource))
+            for resource in THROTTLED_RESOURCES
+        )
+    
+    def _concurrency_for(self, budget: Optional[dict]) -> int:
+        if not budget or not budget["limit"]:
+            return self.max_concurrency
+        
+        remaining = budget["remaining"]
+        if remaining <= self.low_watermark:
+            return 1
+        
+        ratio = remaining / budget["limit"]
+        if ratio >= 0.5:
+            return self.max_concurrency
+        return max(1, int(self.max_concurrency * ratio * 2))
+    
+    def update(self, response: httpx.Response) -> None:
+        """Record the rate-limit budget reported in response headers."""
+        headers = response.headers
+        if "X-RateLimit-Remaining" not in headers:
+            return
+        
+        resource = headers.get("X-RateLimit-Resource", "core")
+        try:
+            self._limits[resource] = {
+                "limit": int(headers.get("X-RateLimit-Limit", 0)),
+                "remaining": int(headers["X-RateLimit-Remaining"]),
+                "used": int(headers.get("X-RateLimit-Used", 0)),
+                "reset": int(headers.get("X-RateLimit-Reset", 0)),
+            }
+        except ValueError:
+            logger.debug(f"Invalid rate limit headers: {dict(headers)}")
+    
+    def _pause(self, seconds: float) -> None:
+        """Pause all requests for the given number of seconds."""
+        self._paused_until = max(self._paused_until, time.time() + seconds)
+    
+    def _pause_within_limit(self, seconds: float) -> None:
+        """Pause all requests, unless the pause is longer than max_wait.
+        
+        Longer pauses make ``request`` give up instead; leaving them in place
+        would stall every later request for the whole window.
+        """
+        if seconds <= self.max_wait:
+            self._pause(seconds)
+    
+    def _backoff(self, attempt: int) -> float:
+        """Exponential backoff with full jitter."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+    
+    @staticmethod
+    def _is_rate_limited(response: httpx.Response) -> bool:
+        """Whether a response is a primary or secondary rate limit (not a plain 403)."""
+        if response.status_code == 429:
+            return True
+        return response.status_code == 403 and (
+            "Retry-After" in response.headers
+            or response.headers.get("X-RateLimit-Remaining") == "0"
+        )
+    
+    def _retry_delay(self, response: httpx.Response, attempt: int) -> Optional[float]:
+        """Get the delay before retrying a response, or None if it should not be retried."""
+        status = response.status_code
+        retry_after = response.headers.get("Retry-After")
+        
+        if status in (403, 429):
+            # Secondary rate limit: GitHub asks us to back off explicitly
+            if retry_after is not None:
+                self._stats["secondary_limits"] += 1
+                try:
+                    delay = float(retry_after)
+                except ValueError:
+                    delay = self._backoff(attempt)
+                self._pause_within_limit(delay)
+                return delay
+            
+            # Primary rate limit exhausted: wait for the budget to reset
+            if response.headers.get("X-RateLimit-Remaining") == "0":
+                try:
+                    reset = int(response.headers["X-RateLimit-Reset"])
+                    delay = max(reset - time.time(), 0) + 1
+                except (KeyError, ValueError):
+                    delay = self._backoff(attempt)
+                self._pause_within_limit(delay)
+                return delay
+            
+            if status == 429:
+                return self._backoff(attempt)
+            return None
+        
+        if status in RETRYABLE_STATUS_CODES:
+            return self._backoff(attempt)
+        return None
+    
+    async def _acquire(self) -> None:
+        """Wait for any pause to end and for a free in-flight slot."""
+        while True:
+            wait = self._paused_until - time.time()
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            
+            async with self._cond:
+                if self._in_flight >= self.allowed_concurrency():
+                    self._stats["throttled"] += 1
+                    await self._cond.wait_for(
+                        lambda: self._in_flight < self.allowed_concurrency()
+                    )
+                if self._paused_until > time.time():
+                    continue
+                self._in_flight += 1
+                return
+    
+    async def _release(self) -> None:
+        async with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+    
+    async def request(
+        self, send: Callable[[], Awaitable[httpx.Response]]
+    ) -> httpx.Response:
+        """Send a request through the scheduler, retrying transient failures.
+        
+        Args:
+            send: Zero-argument coroutine factory that performs the HTTP request.
+        
+        Returns:
+            The final response. Non-retryable errors (and server errors once
+            retries are exhausted) are returned as-is for the caller to handle.
+        
+        Raises:
+            GitHubRateLimitError: If the request is still rate limited when
+                retries run out or the required wait exceeds ``max_wait``.
+        """
+        attempt = 0
+        while True:
+            await self._acquire()
+            try:
+                response = await send()
+            except httpx.TransportError as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(f"GitHub request failed ({e!r}), retrying in {delay:.1f}s")
+            else:
+                self.update(response)
+                delay = self._retry_delay(response, attempt)
+                if delay is None:
+                    return response
+                if attempt >= self.max_retries or delay > self.max_wait:
+                    if delay > self.max_wait:
+                        logger.warning(
+                            f"GitHub rate limited for {delay:.0f}s (> {self.max_wait:.0f}s), "
+                            f"giving up on {response.request.url}"
+                        )
+                    if self._is_rate_limited(response):
+                        raise GitHubRateLimitError(response, delay)
+                    return response
+                logger.warning(
+                    f"GitHub responded {response.status_code}, retrying in {delay:.1f}s"
+                )
+            finally:
+                await self._release()
+            
+            self._stats["retries"] += 1
+            attempt += 1
+            await asyncio.sleep(delay)
+    
+    def status(self) -> dict:
+        """Get the current rate-limit budget and scheduler state."""
+        paused_for = max(self._paused_until - time.time(), 0)
+        return {
+            "resources": self._limits,
+            "in_flight": self._in_flight,
+            "allowed_concurrency": self.allowed_concurrency(),
+            "paused_for_seconds": round(paused_for, 1),
+            **self._stats,
+        }
@@ -0,0 +1,79 @@
+"""Content-addressed cache of parsed portfolio/meta.json files keyed by blob SHA."""
+import logging
+from typing import Optional
+
+from pydantic import ValidationError
+
+from app.database import get_connection
+from app.schemas.repo import PortfolioMeta
+
+logger = logging.getLogger(__name__)
+
+
+class PortfolioMetaCache:
+    """Maps a meta.json git blob SHA to its parsed PortfolioMeta.
+    
+    A blob SHA identifies the exact file contents, so entries never go stale:
+    an unchanged meta.json is never downloaded or parsed again.
+    Entries are kept in memory and persisted to the portfolio_meta_cache table.
+    """
+    
+    MAX_MEMORY_ENTRIES = 1024
+    
+    def __init__(self):
+        self._memory: dict[str, PortfolioMeta] = {}
+    
+    def _remember(self, sha: str, meta: PortfolioMeta) -> None:
+        if len(self._memory) >= self.MAX_MEMORY_ENTRIES:
+            # Drop the oldest entry (dicts keep insertion order)
+            self._memory.pop(next(iter(self._memory)))
+        self._memory[sha] = meta
+    
+    async def get(self, sha: str) -> Optional[PortfolioMeta]:
+        """Get the parsed meta for a blob SHA, or None if not cached."""
+        meta = self._memory.get(sha)
+        if meta is not None:
+            return meta
+        
+        try:
+            async with get_connection() as conn:
+                row = await conn.fetchrow(
+                    "SELECT meta FROM portfolio_meta_cache WHERE sha = $1",
+                    sha
+                )
+        except Exception as e:
+            logger.debug(f"Meta cache lookup failed for {sha}: {e}")
+            return None
+        
+        if not row:
+            return None
+        
+        try:
+            meta = PortfolioMeta.model_validate(row["meta"])
+        except ValidationError as e:
+            # Stored by an older schema - treat as a miss so it is parsed again
+            logger.debug(f"Discarding stale meta cache entry {sha}: {e}")
+            return None
+        self._remember(sha, meta)
+        return meta
+    
+    async def set(self, sha: str, meta: PortfolioMeta) -> None:
+        """Store the parsed meta for a blob SHA."""
+        self._remember(sha, meta)
+        try:
+            async with get_connection() as conn:
+                await conn.execute(
+                    """
+                    INSERT INTO portfolio_meta_cache (sha, meta)
+                    VALUES ($1, $2)
+                    ON CONFLICT (sha) DO UPDATE SET meta = EXCLUDED.meta
+                    """,
+                    sha,
+                    meta.model_dump(mode="json")
+                )
+        except Exception as e:
+            logger.debug(f"Meta cache store failed for {sha}: {e}")
+
+
+# Singleton instance
+portfolio_meta_cache = PortfolioMetaCache()
@@ -0,0 +1,398 @@
+"""Single-flight, checkpointed repository refresh jobs with progress tracking."""
+import asyncio
+import logging
+import time
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from app.config import get_settings
+from app.database import get_connection
+from app.schemas.repo import Repository
+from app.services.github import github_service
+from app.services.repository import repository_service
+from app.services.snapshot import snapshot_exporter
+
+logger = logging.getLogger(__name__)
+
+# pg advisory lock key shared by all workers ("portfolio refresh")
+REFRESH_LOCK_KEY = 0x706F7274
+
+
+class RefreshConflictError(Exception):
+    """A full refresh was requested while an incremental refresh is running."""
+    
+    def __init__(self, job: "RefreshJob"):
+        super().__init__("An incremental refresh is already running; retry the full refresh when it finishes")
+        self.job = job
+
+
+class RefreshJob:
+    """State of a single repository refresh run."""
+    
+    def __init__(self, full: bool, job_id: Optional[str] = None):
+        self.id = job_id or uuid.uuid4().hex
+        self.full = full
+        self.resumed = job_id is not None
+        self.status = "running"  # running, completed, failed, skipped
+        self.message: Optional[str] = None
+        self.total = 0
+        self.done = 0
+        self.updated_count = 0
+        self.changed_count = 0
+        self.skipped_count = 0
+        self.errors: list[str] = []
+        self.started_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+        self._started = time.monotonic()
+        self._elapsed: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+    
+    @property
+    def is_running(self) -> bool:
+        return self.status == "running"
+    
+    def finish(self, status: str, message: Optional[str] = None) -> None:
+        self.status = status
+        self.message = message
+        self.finished_at = datetime.utcnow()
+        self._elapsed = time.monotonic() - self._started
+    
+    def to_dict(self) -> dict:
+        elapsed = self._elapsed if self._elapsed is not None else time.monotonic() - self._started
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "message": self.message,
+            "full": self.full,
+            "done": self.done,
+            "total": self.total,
+            "updated_count": self.updated_count,
+            "changed_count": self.changed_count,
+            "unchanged_count": self.updated_count - self.changed_count,
+            "skipped_count": self.skipped_count,
+            "errors": self.errors,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "elapsed_seconds": round(elapsed, 2),
+        }
+
+
+class RefreshJobManager:
+    """Runs at most one repository refresh at a time.
+    
+    Concurrent triggers in the same process join the in-flight job. Across
+    uvicorn workers, a Postgres advisory lock ensures only one worker syncs;
+    jobs in other workers finish with status ``skipped``.
+    
+    Repositories are bulk-upserted in small batches as they are fetched and
+    checkpointed in ``refresh_run_items``, so a run that fails or is interrupted can be
+    resumed without refetching the repositories it already stored.
+    """
+    
+    MAX_HISTORY = 20
+    
+    def __init__(self):
+        self._jobs: dict[str, RefreshJob] = {}
+        self._current: Optional[RefreshJob] = None
+    
+    def start(self, full: bool = False) -> RefreshJob:
+        """Start a refresh job, or return the in-flight one if a refresh is running.
+        
+        Raises:
+            RefreshConflictError: If ``full`` is requested while an incremental
+                refresh is running (joining it would silently skip the full sync).
+        """
+        if self._current and self._current.is_running:
+            if full and not self._current.full:
+                raise RefreshConflictError(self._current)
+            return self._current
+        return self._launch(RefreshJob(full=full))
+    
+    async def resume(self, job_id: str) -> Optional[RefreshJob]:
+        """Resume a failed or interrupted run, skipping already checkpointed repos.
+        
+        Returns:
+            The resumed job (or the in-flight job if a refresh is running),
+            None if the run does not exist.
+        
+        Raises:
+            ValueError: If the run already completed, was skipped, or is still
+                running in another worker (a ``running`` run is only resumable
+                once it is stale, i.e. no worker holds the refresh lock).
+        """
+        if self._current and self._current.is_running:
+            return self._current
+        
+        run = await self.get_run(job_id)
+        if run is None:
+            return None
+        if run["status"] == "completed":
+            raise ValueError("Refresh job already completed")
+        if run["status"] == "skipped":
+            raise ValueError("Refresh job was skipped; start a new refresh instead")
+        if run["status"] == "running" and await self.is_locked():
+            raise ValueError("Refresh job is still running in another worker")
+        
+        job = RefreshJob(full=run["full"], job_id=job_id)
+        job.done = run["done"]
+        job.updated_count = run["updated_count"]
+        job.changed_count = run["changed_count"]
+        job.skipped_count = run["skipped_count"]
+        job.errors = list(run["errors"])
+        return self._launch(job)
+    
+    async def is_locked(self) -> bool:
+        """Whether any worker currently holds the refresh advisory lock."""
+        async with get_connection() as conn:
+            return await conn.fetchval(
+                """
+                SELECT EXISTS (
+                    SELECT 1 FROM pg_locks
+                    WHERE locktype = 'advisory' AND granted
+                      AND classid = 0 AND objid = $1 AND objsubid = 1
+                )
+                """,
+                REFRESH_LOCK_KEY
+            )
+    
+    def _launch(self, job: RefreshJob) -> RefreshJob:
+        job.task = asyncio.create_task(self._run(job))
+        self._current = job
+        self._jobs[job.id] = job
+        
+        # Keep only recent jobs
+        while len(self._jobs) > self.MAX_HISTORY:
+            self._jobs.pop(next(iter(self._jobs)))
+        
+        return job
+    
+    def get(self, job_id: str) -> Optional[RefreshJob]:
+        return self._jobs.get(job_id)
+    
+    def current(self) -> Optional[RefreshJob]:
+        return self._current
+    
+    async def get_run(self, job_id: str) -> Optional[dict]:
+        """Get a persisted run by id (covers runs started by other workers)."""
+        async with get_connection() as conn:
+            row = await conn.fetchrow(
+                """
+                SELECT id, full_sync, status, message, total, done, updated_count,
+                       changed_count, skipped_count, errors, started_at, finished_at
+                FROM refresh_runs
+                WHERE id = $1
+                """,
+                job_id
+            )
+        
+        if not row:
+            return None
+        
+        errors = row["errors"] or []
+        finished_at = row["finished_at"]
+        elapsed = ((finished_at or datetime.utcnow()) - row["started_at"]).total_seconds()
+        return {
+            "job_id": row["id"],
+            "status": row["status"],
+            "message": row["message"],
+            "full": row["full_sync"],
+            "done": row["done"],
+            "total": row["total"],
+            "updated_count": row["updated_count"],
+            "changed_count": row["changed_count"],
+            "unchanged_count": row["updated_count"] - row["changed_count"],
+            "skipped_count": row["skipped_count"],
+            "errors": errors or [],
+            "started_at": row["started_at"],
+            "finished_at": finished_at,
+            "elapsed_seconds": round(elapsed, 2),
+        }
+    
+    async def wait(self, job: RefreshJob) -> RefreshJob:
+        """Wait for a job to finish without cancelling it if the caller goes away."""
+        if job.task:
+            await asyncio.shield(job.task)
+        return job
+    
+    async def close(self) -> None:
+        """Cancel the in-flight job (called on shutdown); it can be resumed later."""
+        job = self._current
+        if job and job.task and not job.task.done():
+            job.task.cancel()
+            await asyncio.gather(job.task, return_exceptions=True)
+    
+    async def _run(self, job: RefreshJob) -> None:
+        try:
+            async with get_connection() as lock_conn:
+                locked = await lock_conn.fetchval(
+                    "SELECT pg_try_advisory_lock($1)", REFRESH_LOCK_KEY
+                )
+                if not locked:
+                    # Not persisted: a resumed run's row must keep the state
+                    # written by the worker that owns it
+                    job.finish("skipped", "Refresh already running in another worker")
+                    return
+                
+                try:
+                    await self._refresh(job)
+                finally:
+                    await lock_conn.execute(
+                        "SELECT pg_advisory_unlock($1)", REFRESH_LOCK_KEY
+                    )
+            
+            job.finish("completed", "Refresh completed successfully")
+            logger.info(
+                f"Refresh job {job.id} completed: {job.updated_count} repos updated "
+                f"({job.changed_count} changed), {job.skipped_count} skipped, "
+                f"{len(job.errors)} errors"
+            )
+            
+            # Post-refresh hooks: recompute stats (cheap, and catches edits made
+            # outside the sync), republish static snapshots if anything changed
+            await repository_service.refresh_stats()
+            if job.changed_count:
+                snapshot_dir = get_settings().snapshot_dir
+                if snapshot_dir:
+                    await snapshot_exporter.export_safely(snapshot_dir)
+        except asyncio.CancelledError:
+            job.finish("failed", "Refresh interrupted by shutdown")
+            await self._save_run(job)
+            raise
+        except Exception as e:
+            logger.error(f"Refresh job {job.id} failed: {e}")
+            job.finish("failed", f"Failed to refresh repositories: {str(e)}")
+        
+        await self._save_run(job)
+    
+    async def _refresh(self, job: RefreshJob) -> None:
+        sync_state = None if job.full else await repository_service.get_sync_state()
+        github_repos, skipped_count = await github_service.list_repos_to_sync(sync_state)
+        if not job.resumed:
+            job.skipped_count = skipped_count
+        
+        if job.resumed:
+            completed_ids = await self._get_completed_repo_ids(job.id)
+            github_repos = [r for r in github_repos if r["id"] not in completed_ids]
+            job.done = len(completed_ids)
+            
+            # Repos fetched again report fresh errors; keep the rest from the first attempt
+            retried = {github_repo["name"] for github_repo in github_repos}
+            job.errors = [e for e in job.errors if e.split(":", 1)[0] not in retried]
+        
+        job.total = job.done + len(github_repos)
+        await self._save_run(job)
+        
+        # Stream: upsert and checkpoint repos in small batches as they are merged
+        batch_size = max(1, get_settings().refresh_upsert_batch_size)
+        pending: list[tuple[dict, Repository]] = []
+        
+        async def flush() -> None:
+            if not pending:
+                return
+            updated, changed = await repository_service.upsert_many([repo for _, repo in pending])
+            job.updated_count += updated
+            job.changed_count += changed
+            
+            # Partial failure: mark the whole batch failed so a resume retries it
+            error = None if updated == len(pending) else "upsert failed"
+            if error:
+                job.errors.extend(f"{github_repo['name']}: {error}" for github_repo, _ in pending)
+            job.done += len(pending)
+            await self._checkpoint(job, [(github_repo["id"], error) for github_repo, _ in pending])
+            pending.clear()
+        
+        async for github_repo, result in github_service.iter_repos_with_meta(github_repos):
+            if isinstance(result, Exception):
+                job.errors.append(f"{github_repo['name']}: {result}")
+                job.done += 1
+                await self._checkpoint(job, [(github_repo["id"], str(result))])
+                continue
+            
+            pending.append((github_repo, result))
+            if len(pending) >= batch_size:
+                await flush()
+        
+        await flush()
+    
+    async def _get_completed_repo_ids(self, job_id: str) -> set[int]:
+        async with get_connection() as conn:
+            rows = await conn.fetch(
+                "SELECT repo_id FROM refresh_run_items WHERE run_id = $1 AND status = 'done'",
+                job_id
+            )
+            return {row["repo_id"] for row in rows}
+    
+    async def _save_run(self, job: RefreshJob) -> None:
+        """Persist the run's status and counters."""
+        try:
+            async with get_connection() as conn:
+                await conn.execute(
+                    """
+                    INSERT INTO refresh_runs (
+                        id, full_sync, status, message, total, done, updated_count,
+                        changed_count, skipped_count, errors, started_at, finished_at
+                    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
+                    ON CONFLICT (id) DO UPDATE SET
+                        status = EXCLUDED.status,
+                        message = EXCLUDED.message,
+                        total = EXCLUDED.total,
+                        done = EXCLUDED.done,
+                        updated_count = EXCLUDED.updated_count,
+                        changed_count = EXCLUDED.changed_count,
+                        skipped_count = EXCLUDED.skipped_count,
+                        errors = EXCLUDED.errors,
+                        finished_at = EXCLUDED.finished_at
+                    """,
+                    job.id,
+                    job.full,
+                    job.status,
+                    job.message,
+                    job.total,
+                    job.done,
+                    job.updated_count,
+                    job.changed_count,
+                    job.skipped_count,
+                    job.errors,
+                    job.started_at,
+                    job.finished_at,
+                )
+        except Exception as e:
+            logger.error(f"Failed to save refresh run {job.id}: {e}")
+    
+    async def _checkpoint(
+        self, job: RefreshJob, items: list[tuple[int, Optional[str]]]
+    ) -> None:
+        """Record processed repositories as (repo_id, error) and the run's progress."""
+        async with get_connection() as conn:
+            async with conn.transaction():
+                await conn.executemany(
+                    """
+                    INSERT INTO refresh_run_items (run_id, repo_id, status, error, updated_at)
+                    VALUES ($1, $2, $3, $4, NOW())
+                    ON CONFLICT (run_id, repo_id) DO UPDATE SET
+                        status = EXCLUDED.status,
+                        error = EXCLUDED.error,
+                        updated_at = NOW()
+                    """,
+                    [
+                        (job.id, repo_id, "error" if error else "done", error)
+                        for repo_id, error in items
+                    ],
+                )
+                await conn.execute(
+                    """
+                    UPDATE refresh_runs
+                    SET done = $2, updated_count = $3, changed_count = $4, errors = $5
+                    WHERE id = $1
+                    """,
+                    job.id,
+                    job.done,
+                    job.updated_count,
+                    job.changed_count,
+                    job.errors,
+                )
+
+
+# Singleton instance
+refresh_job_manager = RefreshJobManager()
@@ -1,38 +1,491 @@
+import base64
+import hashlib
 import json
 import logging
+import re
+import time
 from datetime import datetime
-from typing import Optional
+from typing import Any, Awaitable, Callable, NamedTuple, Optional
+
+import asyncpg
+import orjson
+from pydantic import BaseModel
 
 from app.database import get_connection
-from app.schemas.repo import Repository
+from app.schemas.repo import Repository, RepositoryStatsResponse, StatCount
+from app.services import cache_bus as cache_keys
+from app.services.cache_bus import cache_bus
 
 logger = logging.getLogger(__name__)
 
+# Architecture / technical detail columns. Written on upsert but only read
+# by the detail endpoint (listings skip them).
+DETAIL_COLUMNS = [
+    "architecture", "system_components", "core_principles", "auth_flow",
+    "data_models", "technical_challenges", "key_achievements", "code_snippets",
+]
+
+# Columns written by upsert/upsert_many (order matches _repo_to_record)
+UPSERT_COLUMNS = [
+    "id", "name", "full_name", "description", "html_url", "language",
+    "stargazers_count", "topics", "github_created_at", "github_updated_at",
+    "title", "subtitle", "project_type", "detailed_description",
+    "features", "technologies", "screenshots", "challenges", "achievements",
+    "priority", "roles", "client_name", "status", "start_date", "end_date",
+    "is_ongoing", "demo_url", "documentation_url", "lines_of_code",
+    "commit_count", "contributor_count", "languages", "has_portfolio_meta", "cached_at",
+    "github_pushed_at", *DETAIL_COLUMNS, "content_hash",
+]
+UPSERT_COLUMNS_SQL = ", ".join(UPSERT_COLUMNS)
+
+# Fields selectable through the list endpoint's ``fields=`` parameter
+LIST_FIELDS = [
+    column for column in UPSERT_COLUMNS
+    if column != "content_hash" and column not in DETAIL_COLUMNS
+] + ["cover_image", "is_visible", "category"]
+LIST_COLUMNS_SQL = ", ".join(LIST_FIELDS)
+
+# Lightweight projection for the project grid (full detail via /repos/{id})
+SUMMARY_FIELDS = [
+    "id", "name", "full_name", "title", "subtitle", "description", "html_url",
+    "language", "topics", "project_type", "technologies", "cover_image",
+    "category", "priority", "stargazers_count", "status", "is_ongoing",
+    "start_date", "end_date", "github_updated_at",
+]
+
+# Defaults applied to NULL columns (mirrors _row_to_repo)
+FIELD_DEFAULTS = {
+    "topics": [], "priority": 0, "status": "completed", "is_ongoing": False,
+    "contributor_count": 1, "has_portfolio_meta": False, "is_visible": True,
+    "category": "기타", "project_type": [], "features": [], "technologies": [],
+    "screenshots": [], "roles": [], "languages": {},
+}
+
+# Read model for public endpoints: field order and defaults of Repository,
+# so row -> dict output serializes exactly like Repository.model_dump()
+REPOSITORY_DEFAULTS = {
+    name: field.get_default(call_default_factory=True)
+    for name, field in Repository.model_fields.items()
+}
+# Listings omit the detail fields entirely rather than sending them empty
+LIST_DEFAULTS = {
+    name: default for name, default in REPOSITORY_DEFAULTS.items()
+    if name not in DETAIL_COLUMNS
+}
+
+# Keyset order for the public listing; matches idx_repositories_keyset
+KEYSET_ORDER_SQL = (
+    "priority DESC, COALESCE(github_updated_at, '-infinity') DESC, id DESC"
+)
+
+# Seconds before search re-checks whether pg_trgm is installed
+TRGM_PROBE_TTL = 300
+
+UPSERT_CONFLICT_SQL = """
+ON CONFLICT (id) DO UPDATE SET
+    name = EXCLUDED.name,
+    full_name = EXCLUDED.full_name,
+    description = EXCLUDED.description,
+    html_url = EXCLUDED.html_url,
+    language = EXCLUDED.language,
+    stargazers_count = EXCLUDED.stargazers_count,
+    topics = EXCLUDED.topics,
+    github_created_at = EXCLUDED.github_created_at,
+    github_updated_at = EXCLUDED.github_updated_at,
+    github_pushed_at = EXCLUDED.github_pushed_at,
+    title = EXCLUDED.title,
+    subtitle = EXCLUDED.subtitle,
+    project_type = EXCLUDED.project_type,
+    detailed_description = EXCLUDED.detailed_description,
+    features = EXCLUDED.features,
+    technologies = EXCLUDED.technologies,
+    -- screenshots와 cover_image는 기존 값 보존 (관리자가 수동 업로드한 경우)
+    screenshots = CASE 
+        WHEN repositories.screenshots IS NOT NULL AND repositories.screenshots != '[]'::jsonb 
+        THEN repositories.screenshots 
+        ELSE EXCLUDED.screenshots 
+    END,
+    cover_image = COALESCE(repositories.cover_image, EXCLUDED.cover_image),
+    challenges = EXCLUDED.challenges,
+    achievements = EXCLUDED.achievements,
+    priority = EXCLUDED.priority,
+    roles = EXCLUDED.roles,
+    client_name = EXCLUDED.client_name,
+    status = EXCLUDED.status,
+    start_date = EXCLUDED.start_date,
+    end_date = EXCLUDED.end_date,
+    is_ongoing = EXCLUDED.is_ongoing,
+    demo_url = EXCLUDED.demo_url,
+    documentation_url = EXCLUDED.documentation_url,
+    lines_of_code = EXCLUDED.lines_of_code,
+    commit_count = EXCLUDED.commit_count,
+    contributor_count = EXCLUDED.contributor_count,
+    languages = EXCLUDED.languages,
+    has_portfolio_meta = EXCLUDED.has_portfolio_meta,
+    architecture = EXCLUDED.architecture,
+    system_components = EXCLUDED.system_components,
+    core_principles = EXCLUDED.core_principles,
+    auth_flow = EXCLUDED.auth_flow,
+    data_models = EXCLUDED.data_models,
+    technical_challenges = EXCLUDED.technical_challenges,
+    key_achievements = EXCLUDED.key_achievements,
+    code_snippets = EXCLUDED.code_snippets,
+    cached_at = EXCLUDED.cached_at,
+    content_hash = EXCLUDED.content_hash
+-- 내용이 바뀌지 않은 행은 다시 쓰지 않음 (WAL/dead tuple 감소)
+WHERE repositories.content_hash IS DISTINCT FROM EXCLUDED.content_hash
+"""
+
+
+class EncodedPayload(NamedTuple):
+    """Pre-serialized JSON response body and its strong ETag."""
+    body: bytes
+    etag: str
+
+
+def encode_payload(data: Any) -> EncodedPayload:
+    """Serialize a response model (or plain dict) with orjson and derive a content ETag.
+    
+    The ETag is a hash of the bytes, so every worker produces the same tag
+    for the same data.
+    """
+    if isinstance(data, BaseModel):
+        data = data.model_dump()
+    body = orjson.dumps(data, option=orjson.OPT_UTC_Z)
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    return EncodedPayload(body, etag)
+
 
 class RepositoryService:
     """Service for repository database operations."""
     
-    async def get_all(self, include_hidden: bool = False) -> list[Repository]:
+    def __init__(self):
+        # Read-through cache for the public (visible) listing, keyed by name.
+        # Entries are tagged with the version they were loaded at; any write
+        # bumps the version so stale entries are never served.
+        self._cache_version = 0
+        self._cache: dict[str, tuple[int, Any]] = {}
+        cache_bus.subscribe(cache_keys.REPOSITORIES, self.invalidate_cache)
+        # pg_trgm probe result and when it expires (extensions can be added/dropped)
+        self._trgm_available: Optional[bool] = None
+        self._trgm_checked_at = 0.0
+    
+    @property
+    def cache_version(self) -> int:
+        """Version of the cached data, bumped whenever the table is written."""
+        return self._cache_version
+    
+    def invalidate_cache(self) -> None:
+        """Drop this worker's cached listings.
+        
+        Write paths should call ``notify_changed`` instead, which also
+        invalidates the caches of other workers.
+        """
+        self._cache_version += 1
+        self._cache.clear()
+    
+    async def notify_changed(self) -> None:
+        """Invalidate repository caches in all workers after a write."""
+        await cache_bus.publish(cache_keys.REPOSITORIES)
+    
+    async def _read_through(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return a cached value, loading it on miss.
+        
+        A value loaded while a write happened is returned but not cached.
+        """
+        version = self._cache_version
+        entry = self._cache.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        
+        value = await loader()
+        if self._cache_version == version:
+            self._cache[key] = (version, value)
+        return value
+    
+    async def get_all(
+        self, include_hidden: bool = False, include_details: bool = False
+    ) -> list[Repository]:
         """Get all cached repositories ordered by priority.
         
         Args:
             include_hidden: If True, return all repos including hidden ones (for admin).
                           If False, return only visible repos (for frontend).
+                          The visible list is served from the in-process cache.
+            include_details: Also load the architecture/technical detail
+                             columns (skipped by listings, see DETAIL_COLUMNS).
         """
+        if include_hidden or include_details:
+            return await self._fetch_all(include_hidden, include_details)
+        return await self._read_through(
+            "visible", lambda: self._fetch_all(include_hidden=False)
+        )
+    
+    async def _fetch_all(
+        self, include_hidden: bool, include_details: bool = False
+    ) -> list[Repository]:
+        rows = await self._fetch_rows(include_hidden, include_details)
+        return [self._row_to_repo(row) for row in rows]
+    
+    async def _fetch_rows(self, include_hidden: bool, include_details: bool = False) -> list:
+        columns_sql = "*" if include_details else LIST_COLUMNS_SQL
         async with get_connection() as conn:
             if include_hidden:
-                rows = await conn.fetch("""
-                    SELECT * FROM repositories
-                    ORDER BY priority DESC, github_updated_at DESC NULLS LAST
+                rows = await conn.fetch(f"""
+                    SELECT {columns_sql} FROM repositories
+                    ORDER BY priority DESC, github_updated_at DESC NULLS LAST, id DESC
                 """)
             else:
-                rows = await conn.fetch("""
-                    SELECT * FROM repositories
+                rows = await conn.fetch(f"""
+                    SELECT {columns_sql} FROM repositories
                     WHERE is_visible = true
-                    ORDER BY priority DESC, github_updated_at DESC NULLS LAST
+                    ORDER BY priority DESC, github_updated_at DESC NULLS LAST, id DESC
                 """)
             
-            return [self._row_to_repo(row) for row in rows]
+            return rows
+    
+    async def get_list_payload(self) -> EncodedPayload:
+        """Encoded public listing, regenerated only when the data changes."""
+        return await self._read_through("visible_payload", self._build_list_payload)
+    
+    async def _build_list_payload(self) -> EncodedPayload:
+        # Rows go straight to dicts; no Repository models on the public path
+        repos = [
+            self._row_to_dict(row, include_details=False)
+            for row in await self._fetch_rows(include_hidden=False)
+        ]
+        last_updated = await self.get_last_updated()
+        return encode_payload({
+            "repositories": repos,
+            "total": len(repos),
+            "last_updated": last_updated,
+        })
+    
+    async def get_payload(self, repo_id: int) -> Optional[EncodedPayload]:
+        """Encoded single repository, regenerated only when the data changes."""
+        key = f"repo:{repo_id}"
+        payload = await self._read_through(key, lambda: self._build_payload(repo_id))
+        if payload is None:
+            # Don't let lookups of unknown ids grow the cache
+            self._cache.pop(key, None)
+        return payload
+    
+    async def _build_payload(self, repo_id: int) -> Optional[EncodedPayload]:
+        # Only the detail payload loads the DETAIL_COLUMNS
+        async with get_connection() as conn:
+            row = await conn.fetchrow("SELECT * FROM repositories WHERE id = $1", repo_id)
+        return encode_payload(self._row_to_dict(row)) if row else None
+    
+    async def get_detail_payloads(self) -> dict[int, EncodedPayload]:
+        """Encoded detail payloads of every visible repository (one query, for export)."""
+        async with get_connection() as conn:
+            rows = await conn.fetch("SELECT * FROM repositories WHERE is_visible = true")
+        return {row["id"]: encode_payload(self._row_to_dict(row)) for row in rows}
+    
+    def resolve_fields(self, fields: Optional[str]) -> list[str]:
+        """Parse a ``fields=`` selector into a column list.
+        
+        Accepts ``summary`` (the default), ``all`` or a comma-separated
+        list of field names. ``id`` is always included.
+        
+        Raises:
+            ValueError: If an unknown field is requested
+        """
+        if not fields or fields == "summary":
+            return SUMMARY_FIELDS
+        if fields == "all":
+            return LIST_FIELDS
+        
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in requested if field not in LIST_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        
+        return ["id"] + [field for field in dict.fromkeys(requested) if field != "id"]
+    
+    @staticmethod
+    def _encode_cursor(priority: int, sort_updated_at: str, repo_id: int) -> str:
+        raw = json.dumps([priority, sort_updated_at, repo_id]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+    
+    @staticmethod
+    def _decode_cursor(cursor: str) -> tuple[int, str, int]:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            priority, sort_updated_at, repo_id = json.loads(raw)
+            return int(priority), str(sort_updated_at), int(repo_id)
+        except Exception:
+            raise ValueError("Invalid cursor")
+    
+    async def list_page(
+        self,
+        columns: list[str],
+        limit: int,
+        cursor: Optional[str] = None,
+        filters: Optional[dict[str, str]] = None,
+    ) -> tuple[list[dict], Optional[str]]:
+        """Get one page of visible repositories using keyset pagination.
+        
+        Pages are ordered by (priority, github_updated_at, id) descending and
+        continue after the position encoded in ``cursor``, so deep pages cost
+        the same as the first one.
+        
+        Args:
+            columns: Columns to return (see resolve_fields)
+            limit: Page size
+            cursor: ``next_cursor`` of the previous page
+            filters: Optional category / language / technology /
+                     project_type / topic filters, evaluated in SQL
+        
+        Returns:
+            Tuple of (repositories as dicts of the selected columns, next cursor)
+        
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        query, params = self.build_page_query(columns, limit, cursor, filters)
+        
+        async with get_connection() as conn:
+            rows = await conn.fetch(query, *params)
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            last = rows[-1]
+            next_cursor = self._encode_cursor(
+                last["_sort_priority"], last["_sort_updated_at"], last["id"]
+            )
+        
+        return [self._row_to_fields(row, columns) for row in rows], next_cursor
+    
+    def build_page_query(
+        self,
+        columns: list[str],
+        limit: int,
+        cursor: Optional[str] = None,
+        filters: Optional[dict[str, str]] = None,
+    ) -> tuple[str, list[Any]]:
+        """Build the SQL and parameters for list_page (fetches limit + 1 rows)."""
+        select_sql = ", ".join(columns)
+        conditions = ["is_visible = true"]
+        params: list[Any] = []
+        
+        def param(value: Any) -> str:
+            params.append(value)
+            return f"${len(params)}"
+        
+        filters = filters or {}
+        if filters.get("category"):
+            conditions.append(f"category = {param(filters['category'])}")
+        if filters.get("language"):
+            conditions.append(f"language = {param(filters['language'])}")
+        if filters.get("technology"):
+            # GIN (jsonb_path_ops) containment on idx_repositories_technologies
+            conditions.append(
+                f"technologies @> jsonb_build_array(jsonb_build_object('name', {param(filters['technology'])}::text))"
+            )
+        if filters.get("project_type"):
+            conditions.append(
+                f"project_type @> jsonb_build_array({param(filters['project_type'])}::text)"
+            )
+        if filters.get("topic"):
+            conditions.append(f"topics @> ARRAY[{param(filters['topic'])}::text]")
+        
+        if cursor:
+            priority, sort_updated_at, repo_id = self._decode_cursor(cursor)
+            conditions.append(
+                "(priority, COALESCE(github_updated_at, '-infinity'), id)"
+                f" < ({param(priority)}, {param(sort_updated_at)}::text::timestamptz, {param(repo_id)})"
+            )
+        
+        limit_param = param(limit + 1)
+        
+        query = f"""
+            SELECT {select_sql},
+                   priority AS _sort_priority,
+                   COALESCE(github_updated_at, '-infinity')::text AS _sort_updated_at
+            FROM repositories
+            WHERE {" AND ".join(conditions)}
+            ORDER BY {KEYSET_ORDER_SQL}
+            LIMIT {limit_param}
+        """
+        return query, params
+    
+    @staticmethod
+    def _to_prefix_tsquery(q: str) -> Optional[str]:
+        """Turn free text into an AND of prefix terms ('웹:* & 포트폴리오:*').
+        
+        Prefix matching lets Korean words match with attached particles
+        (e.g. '포트폴리오' matches '포트폴리오를') under the 'simple' config.
+        """
+        terms = re.findall(r"\w+", q)[:10]
+        if not terms:
+            return None
+        return " & ".join(f"{term}:*" for term in terms)
+    
+    async def _has_trgm(self, conn) -> bool:
+        """Whether pg_trgm is installed, re-probed every TRGM_PROBE_TTL seconds."""
+        if (
+            self._trgm_available is None
+            or time.monotonic() - self._trgm_checked_at > TRGM_PROBE_TTL
+        ):
+            self._trgm_available = await conn.fetchval(
+                "SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm')"
+            )
+            self._trgm_checked_at = time.monotonic()
+        return self._trgm_available
+    
+    async def search(self, q: str, limit: int = 20) -> list[dict]:
+        """Full-text search over visible repositories, best match first.
+        
+        Uses the stored search_vector (GIN indexed). If nothing matches and
+        pg_trgm is installed, falls back to fuzzy matching on the title so
+        typos still find something.
+        
+        Returns:
+            Summary fields of each match plus its ``rank``
+        """
+        tsquery = self._to_prefix_tsquery(q)
+        if not tsquery:
+            return []
+        
+        select_sql = ", ".join(SUMMARY_FIELDS)
+        async with get_connection() as conn:
+            rows = await conn.fetch(
+                f"""
+                SELECT {select_sql}, ts_rank_cd(search_vector, query) AS rank
+                FROM repositories, to_tsquery('simple', $1) AS query
+                WHERE is_visible = true AND search_vector @@ query
+                ORDER BY rank DESC, priority DESC, id DESC
+                LIMIT $2
+                """,
+                tsquery, limit
+            )
+            
+            if not rows and await self._has_trgm(conn):
+                try:
+                    rows = await conn.fetch(
+                        f"""
+                        SELECT {select_sql},
+                               word_similarity($1, coalesce(title, '') || ' ' || name) AS rank
+                        FROM repositories
+                        WHERE is_visible = true
+                          AND $1 <% (coalesce(title, '') || ' ' || name)
+                        ORDER BY rank DESC, priority DESC, id DESC
+                        LIMIT $2
+                        """,
+                        q, limit
+                    )
+                except (asyncpg.UndefinedFunctionError, asyncpg.UndefinedObjectError):
+                    # pg_trgm was dropped since the last probe
+                    logger.warning("pg_trgm unavailable, disabling fuzzy search fallback")
+                    self._trgm_available = False
+                    self._trgm_checked_at = time.monotonic()
+        
+        return [
+            {**self._row_to_fields(row, SUMMARY_FIELDS), "rank": row["rank"]}
+            for row in rows
+        ]
     
     async def get_by_id(self, repo_id: int) -> Optional[Repository]:
         """Get a single repository by ID."""
@@ -47,112 +500,89 @@ class RepositoryService:
             return None
     
     async def upsert(self, repo: Repository) -> Repository:
-        """Insert or update a repository."""
+        """Insert or update a repository (skipped if its content hash is unchanged)."""
+        if await self._upsert_one(repo):
+            await self.notify_changed()
+        return repo
+    
+    async def _upsert_one(self, repo: Repository) -> bool:
+        """Upsert a single repository. Returns True if a row was inserted or changed."""
+        placeholders = ", ".join(f"${i}" for i in range(1, len(UPSERT_COLUMNS) + 1))
         async with get_connection() as conn:
-            await conn.execute("""
-                INSERT INTO repositories (
-                    id, name, full_name, description, html_url, language,
-                    stargazers_count, topics, github_created_at, github_updated_at,
-                    title, subtitle, project_type, detailed_description,
-                    features, technologies, screenshots, challenges, achievements,
-                    priority, roles, client_name, status, start_date, end_date,
-                    is_ongoing, demo_url, documentation_url, lines_of_code,
-                    commit_count, contributor_count, languages, has_portfolio_meta, cached_at
-                ) VALUES (
-                    $1, $2, $3, $4, $5, $6, $7, $8, $9, $10,
-                    $11, $12, $13, $14, $15, $16, $17, $18, $19,
-                    $20, $21, $22, $23, $24, $25, $26, $27, $28,
-                    $29, $30, $31, $32, $33, $34
-                )
-                ON CONFLICT (id) DO UPDATE SET
-                    name = EXCLUDED.name,
-                    full_name = EXCLUDED.full_name,
-                    description = EXCLUDED.description,
-                    html_url = EXCLUDED.html_url,
-                    language = EXCLUDED.language,
-                    stargazers_count = EXCLUDED.stargazers_count,
-                    topics = EXCLUDED.topics,
-                    github_created_at = EXCLUDED.github_created_at,
-                    github_updated_at = EXCLUDED.github_updated_at,
-                    title = EXCLUDED.title,
-                    subtitle = EXCLUDED.subtitle,
-                    project_type = EXCLUDED.project_type,
-                    detailed_description = EXCLUDED.detailed_description,
-                    features = EXCLUDED.features,
-                    technologies = EXCLUDED.technologies,
-                    -- screenshots와 cover_image는 기존 값 보존 (관리자가 수동 업로드한 경우)
-                    screenshots = CASE 
-                        WHEN repositories.screenshots IS NOT NULL AND repositories.screenshots != '[]'::jsonb 
-                        THEN repositories.screenshots 
-                        ELSE EXCLUDED.screenshots 
-                    END,
-                    cover_image = COALESCE(repositories.cover_image, EXCLUDED.cover_image),
-                    challenges = EXCLUDED.challenges,
-                    achievements = EXCLUDED.achievements,
-                    priority = EXCLUDED.priority,
-                    roles = EXCLUDED.roles,
-                    client_name = EXCLUDED.client_name,
-                    status = EXCLUDED.status,
-                    start_date = EXCLUDED.start_date,
-                    end_date = EXCLUDED.end_date,
-                    is_ongoing = EXCLUDED.is_ongoing,
-                    demo_url = EXCLUDED.demo_url,
-                    documentation_url = EXCLUDED.documentation_url,
-                    lines_of_code = EXCLUDED.lines_of_code,
-                    commit_count = EXCLUDED.commit_count,
-                    contributor_count = EXCLUDED.contributor_count,
-                    languages = EXCLUDED.languages,
-                    has_portfolio_meta = EXCLUDED.has_portfolio_meta,
-                    cached_at = EXCLUDED.cached_at
-            """,
-                repo.id,
-                repo.name,
-                repo.full_name,
-                repo.description,
-                repo.html_url,
-                repo.language,
-                repo.stargazers_count,
-                repo.topics,
-                repo.github_created_at,
-                repo.github_updated_at,
-                repo.title,
-                repo.subtitle,
-                repo.project_type,
-                repo.detailed_description,
-                json.dumps(repo.features),
-                json.dumps(repo.technologies),
-                json.dumps(repo.screenshots),
-                repo.challenges,
-                repo.achievements,
-                repo.priority,
-                json.dumps(repo.roles),
-                repo.client_name,
-                repo.status,
-                repo.start_date,
-                repo.end_date,
-                repo.is_ongoing,
-                repo.demo_url,
-                repo.documentation_url,
-                repo.lines_of_code,
-                repo.commit_count,
-                repo.contributor_count,
-                json.dumps(repo.languages),
-                repo.has_portfolio_meta,
-                repo.cached_at or datetime.utcnow(),
+            result = await conn.execute(
+                f"""
+                INSERT INTO repositories ({UPSERT_COLUMNS_SQL})
+                VALUES ({placeholders})
+                {UPSERT_CONFLICT_SQL}
+                """,
+                *self._repo_to_record(repo),
             )
-            
-            return repo
+            return result != "INSERT 0 0"
     
-    async def upsert_many(self, repos: list[Repository]) -> int:
-        """Insert or update multiple repositories."""
-        count = 0
-        for repo in repos:
+    async def upsert_many(self, repos: list[Repository]) -> tuple[int, int]:
+        """Insert or update multiple repositories in one transaction.
+        
+        Rows are COPYed into a temporary staging table and merged with a single
+        INSERT ... SELECT ... ON CONFLICT, instead of one round-trip per repo.
+        Rows whose content hash is unchanged are not rewritten.
+        Falls back to per-row upserts if the bulk merge fails.
+        
+        Returns:
+            Tuple of (repos stored successfully, rows actually inserted or changed).
+        """
+        if not repos:
+            return 0, 0
+        
+        # ON CONFLICT can't touch the same row twice in one statement - keep the last
+        unique_repos = list({repo.id: repo for repo in repos}.values())
+        
+        try:
+            async with get_connection() as conn:
+                async with conn.transaction():
+                    await conn.execute("""
+                        CREATE TEMP TABLE repositories_staging
+                        (LIKE repositories INCLUDING DEFAULTS)
+                        ON COMMIT DROP
+                    """)
+                    await conn.copy_records_to_table(
+                        "repositories_staging",
+                        records=[self._repo_to_record(repo) for repo in unique_repos],
+                        columns=UPSERT_COLUMNS,
+                    )
+                    result = await conn.execute(f"""
+                        INSERT INTO repositories ({UPSERT_COLUMNS_SQL})
+                        SELECT {UPSERT_COLUMNS_SQL} FROM repositories_staging
+                        {UPSERT_CONFLICT_SQL}
+                    """)
+            # Status is "INSERT 0 <rows inserted or updated>"
+            changed = int(result.split()[-1])
+            if changed:
+                await self.notify_changed()
+            return len(unique_repos), changed
+        except Exception as e:
+            logger.error(f"Bulk upsert failed, falling back to per-row upsert: {e}")
+        
+        stored = 0
+        changed = 0
+        for repo in unique_repos:
             try:
-                await self.upsert(repo)
-                count += 1
+                if await self._upsert_one(repo):
+                    changed += 1
+                stored += 1
             except Exception as e:
                 logger.error(f"Failed to upsert repo {repo.name}: {e}")
-        return count
+        if changed:
+            await self.notify_changed()
+        return stored, changed
+    
+    async def get_sync_state(self) -> dict[int, dict]:
+        """Get stored GitHub watermarks by repo id, used for incremental sync."""
+        async with get_connection() as conn:
+            rows = await conn.fetch("""
+                SELECT id, github_updated_at, github_pushed_at, cached_at
+                FROM repositories
+            """)
+            return {row["id"]: dict(row) for row in rows}
     
     async def delete(self, repo_id: int) -> bool:
         """Delete a repository by ID."""
@@ -161,10 +591,52 @@ class RepositoryService:
                 "DELETE FROM repositories WHERE id = $1",
                 repo_id
             )
-            return result == "DELETE 1"
+        await self.notify_changed()
+        await self.refresh_stats()
+        return result == "DELETE 1"
+    
+    async def get_stats(self) -> RepositoryStatsResponse:
+        """Aggregate statistics from the repository_stats materialized view."""
+        async with get_connection() as conn:
+            rows = await conn.fetch("""
+                SELECT kind, key, repo_count, total_bytes, lines_of_code, commit_count
+                FROM repository_stats
+                ORDER BY kind, total_bytes DESC NULLS LAST, repo_count DESC, key
+            """)
+        
+        stats = RepositoryStatsResponse()
+        buckets = {
+            "language": stats.languages,
+            "technology": stats.technologies,
+            "category": stats.categories,
+            "status": stats.statuses,
+        }
+        for row in rows:
+            if row["kind"] == "total":
+                stats.total_repos = row["repo_count"]
+                stats.total_lines_of_code = row["lines_of_code"]
+                stats.total_commits = row["commit_count"]
+            elif row["kind"] in buckets:
+                buckets[row["kind"]].append(StatCount(
+                    name=row["key"],
+                    repo_count=row["repo_count"],
+                    total_bytes=row["total_bytes"],
+                ))
+        return stats
+    
+    async def refresh_stats(self) -> None:
+        """Recompute the repository_stats view without blocking readers."""
+        try:
+            async with get_connection() as conn:
+                await conn.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY repository_stats")
+        except Exception as e:
+            logger.error(f"Failed to refresh repository stats: {e}")
     
     async def get_last_updated(self) -> Optional[datetime]:
-        """Get the most recent cached_at timestamp."""
+        """Get the most recent cached_at timestamp (served from the in-process cache)."""
+        return await self._read_through("last_updated", self._fetch_last_updated)
+    
+    async def _fetch_last_updated(self) -> Optional[datetime]:
         async with get_connection() as conn:
             row = await conn.fetchrow(
                 "SELECT MAX(cached_at) as last_updated FROM repositories"
@@ -189,22 +661,90 @@ class RepositoryService:
                 repo_id,
                 is_visible
             )
-            return result == "UPDATE 1"
-    
-    def _parse_json_field(self, value, default=None):
-        """Parse JSON field from database (handles both string and already parsed values)."""
-        if default is None:
-            default = []
-        if value is None:
-            return default
-        if isinstance(value, (list, dict)):
-            return value
-        if isinstance(value, str):
-            try:
-                return json.loads(value)
-            except (json.JSONDecodeError, TypeError):
-                return default
-        return default
+        await self.notify_changed()
+        await self.refresh_stats()
+        return result == "UPDATE 1"
+    
+    def _repo_to_record(self, repo: Repository) -> tuple:
+        """Convert a Repository into a row tuple matching UPSERT_COLUMNS."""
+        values = (
+            repo.id,
+            repo.name,
+            repo.full_name,
+            repo.description,
+            repo.html_url,
+            repo.language,
+            repo.stargazers_count,
+            repo.topics,
+            repo.github_created_at,
+            repo.github_updated_at,
+            repo.title,
+            repo.subtitle,
+            repo.project_type,
+            repo.detailed_description,
+            repo.features,
+            repo.technologies,
+            repo.screenshots,
+            repo.challenges,
+            repo.achievements,
+            repo.priority,
+            repo.roles,
+            repo.client_name,
+            repo.status,
+            repo.start_date,
+            repo.end_date,
+            repo.is_ongoing,
+            repo.demo_url,
+            repo.documentation_url,
+            repo.lines_of_code,
+            repo.commit_count,
+            repo.contributor_count,
+            repo.languages,
+            repo.has_portfolio_meta,
+            repo.cached_at or datetime.utcnow(),
+            repo.github_pushed_at,
+            repo.architecture,
+            repo.system_components,
+            repo.core_principles,
+            repo.auth_flow,
+            repo.data_models,
+            repo.technical_challenges,
+            repo.key_achievements,
+            repo.code_snippets,
+        )
+        return values + (self._content_hash(values),)
+    
+    def _content_hash(self, values: tuple) -> str:
+        """Hash the written column values, ignoring cached_at (changes on every refresh)."""
+        cached_at_index = UPSERT_COLUMNS.index("cached_at")
+        content = [v for i, v in enumerate(values) if i != cached_at_index]
+        return hashlib.sha256(orjson.dumps(content, default=str)).hexdigest()
+    
+    def _row_to_fields(self, row, columns: list[str]) -> dict:
+        """Convert a projected database row to a dict of the selected fields."""
+        result = {}
+        for column in columns:
+            value = row[column]
+            if value is None and column in FIELD_DEFAULTS:
+                default = FIELD_DEFAULTS[column]
+                value = default.copy() if isinstance(default, (list, dict)) else default
+            result[column] = value
+        return result
+    
+    def _row_to_dict(self, row, include_details: bool = True) -> dict:
+        """Convert a database row to the public Repository JSON shape without pydantic.
+        
+        NULL columns (and fields without a column) take the model default.
+        With ``include_details=False`` (listings) the DETAIL_COLUMNS keys are omitted.
+        """
+        defaults = REPOSITORY_DEFAULTS if include_details else LIST_DEFAULTS
+        result = {}
+        for field, default in defaults.items():
+            value = row.get(field)
+            if value is None:
+                value = default.copy() if isinstance(default, (list, dict)) else default
+            result[field] = value
+        return result
     
     def _row_to_repo(self, row) -> Repository:
         """Convert database row to Repository model."""
@@ -219,17 +759,18 @@ class RepositoryService:
             topics=row["topics"] or [],
             github_created_at=row["github_created_at"],
             github_updated_at=row["github_updated_at"],
+            github_pushed_at=row.get("github_pushed_at"),
             title=row["title"],
             subtitle=row["subtitle"],
-            project_type=self._parse_json_field(row["project_type"]),
+            project_type=row["project_type"] or [],
             detailed_description=row["detailed_description"],
-            features=self._parse_json_field(row["features"]),
-            technologies=self._parse_json_field(row["technologies"]),
-            screenshots=self._parse_json_field(row["screenshots"]),
+            features=row["features"] or [],
+            technologies=row["technologies"] or [],
+            screenshots=row["screenshots"] or [],
             challenges=row["challenges"],
             achievements=row["achievements"],
             priority=row["priority"] or 0,
-            roles=self._parse_json_field(row["roles"]),
+            roles=row["roles"] or [],
             client_name=row["client_name"],
             status=row["status"] or "completed",
             start_date=row["start_date"],
@@ -243,7 +784,15 @@ class RepositoryService:
             lines_of_code=row["lines_of_code"],
             commit_count=row["commit_count"],
             contributor_count=row["contributor_count"] or 1,
-            languages=self._parse_json_field(row.get("languages"), {}),
+            languages=row.get("languages") or {},
+            architecture=row.get("architecture"),
+            system_components=row.get("system_components") or [],
+            core_principles=row.get("core_principles") or [],
+            auth_flow=row.get("auth_flow") or [],
+            data_models=row.get("data_models") or [],
+            technical_challenges=row.get("technical_challenges") or [],
+            key_achievements=row.get("key_achievements") or [],
+            code_snippets=row.get("code_snippets") or [],
             has_portfolio_meta=row["has_portfolio_meta"] or False,
             cached_at=row["cached_at"],
         )
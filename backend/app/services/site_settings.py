@@ -0,0 +1,62 @@
+"""Public site settings (SNS links), shared by the settings router and the snapshot exporter."""
+import logging
+from typing import Optional
+
+from app.database import get_connection
+from app.schemas.settings import SNSLinksResponse
+from app.services import cache_bus as cache_keys
+from app.services.cache_bus import cache_bus
+
+logger = logging.getLogger(__name__)
+
+
+class SiteSettingsService:
+    """Reads public site settings, caching the SNS links per worker.
+    
+    The cache is dropped on any settings write (in every worker). It is
+    tagged with the version it was loaded at, like
+    ``RepositoryService._read_through``: a read that overlaps a write is
+    returned but never cached.
+    """
+    
+    def __init__(self):
+        self._version = 0
+        self._sns_cache: Optional[tuple[int, SNSLinksResponse]] = None
+        cache_bus.subscribe(cache_keys.SETTINGS, self.invalidate_cache)
+    
+    def invalidate_cache(self) -> None:
+        """Drop cached settings in this worker."""
+        self._version += 1
+        self._sns_cache = None
+    
+    async def get_sns_links(self) -> SNSLinksResponse:
+        """SNS links for public display (served from the in-process cache)."""
+        version = self._version
+        if self._sns_cache is not None and self._sns_cache[0] == version:
+            return self._sns_cache[1]
+        
+        async with get_connection() as conn:
+            rows = await conn.fetch(
+                """
+                SELECT key, value FROM site_settings
+                WHERE key LIKE 'sns_%' OR key = 'contact_email'
+                """
+            )
+        
+        settings = {row['key']: row['value'] for row in rows}
+        
+        response = SNSLinksResponse(
+            threads=settings.get('sns_threads', ''),
+            youtube=settings.get('sns_youtube', ''),
+            github=settings.get('sns_github', ''),
+            linkedin=settings.get('sns_linkedin', ''),
+            email=settings.get('contact_email', '')
+        )
+        
+        if self._version == version:
+            self._sns_cache = (version, response)
+        return response
+
+
+# Singleton instance
+site_settings_service = SiteSettingsService()
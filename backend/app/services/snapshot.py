@@ -0,0 +1,200 @@
+"""Static JSON snapshots of the public API for CDN/edge serving."""
+import asyncio
+import gzip
+import hashlib
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import brotli
+import orjson
+
+from app.config import get_settings
+from app.database import get_connection
+from app.services.repository import encode_payload, repository_service
+from app.services.site_settings import site_settings_service
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+
+# pg advisory lock key serializing exports across workers ("snap")
+SNAPSHOT_LOCK_KEY = 0x736E6170
+
+
+class SnapshotExporter:
+    """Writes the public read endpoints as precompressed, content-hashed files.
+    
+    Layout of the output directory::
+    
+        repos.<hash>.json(.gz|.br)          GET /api/repos
+        repos/<id>.<hash>.json(.gz|.br)     GET /api/repos/{id}
+        stats.<hash>.json(.gz|.br)          GET /api/repos/stats
+        sns.<hash>.json(.gz|.br)            GET /api/settings/sns
+        manifest.json                       maps each of the above to its file
+    
+    Hashed files are immutable and can be cached forever; only the manifest
+    needs revalidation. Files referenced by the previous manifest are kept
+    so clients holding it can still load their data.
+    
+    Every worker may export into the same directory, so exports are
+    serialized with a Postgres advisory lock as well as a local lock.
+    """
+    
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._pending: Optional[asyncio.Task] = None
+    
+    async def export(self, output_dir: str) -> dict:
+        """Export all snapshots to output_dir and return the new manifest."""
+        async with self._lock, get_connection() as lock_conn:
+            # Wait for an export in another worker rather than skipping:
+            # it may have read the data before our write
+            await lock_conn.execute("SELECT pg_advisory_lock($1)", SNAPSHOT_LOCK_KEY)
+            try:
+                listing = await repository_service.get_list_payload()
+                details = await repository_service.get_detail_payloads()
+                stats = encode_payload(await repository_service.get_stats())
+                sns = encode_payload(await site_settings_service.get_sns_links())
+                
+                return await asyncio.to_thread(
+                    self._write, Path(output_dir), listing.body, {
+                        repo_id: payload.body for repo_id, payload in details.items()
+                    }, stats.body, sns.body
+                )
+            finally:
+                await lock_conn.execute("SELECT pg_advisory_unlock($1)", SNAPSHOT_LOCK_KEY)
+    
+    async def export_safely(self, output_dir: str) -> Optional[dict]:
+        """Export, logging instead of raising (for post-refresh and post-write hooks)."""
+        try:
+            manifest = await self.export(output_dir)
+            logger.info(f"Exported static snapshot to {output_dir} ({len(manifest['repo'])} repos)")
+            return manifest
+        except Exception as e:
+            logger.error(f"Static snapshot export failed: {e}")
+            return None
+    
+    def schedule(self, delay: Optional[float] = None) -> None:
+        """Schedule (or reschedule) a background export after an admin write.
+        
+        Does nothing unless ``snapshot_dir`` is configured. Each call restarts
+        the timer, so a burst of edits triggers a single export.
+        """
+        settings = get_settings()
+        if not settings.snapshot_dir:
+            return
+        if delay is None:
+            delay = settings.snapshot_export_debounce
+        
+        if self._pending and not self._pending.done():
+            self._pending.cancel()
+        self._pending = asyncio.create_task(self._export_later(settings.snapshot_dir, delay))
+    
+    async def _export_later(self, output_dir: str, delay: float) -> None:
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            return
+        
+        # Past the debounce window - later writes schedule a new export
+        if self._pending is asyncio.current_task():
+            self._pending = None
+        
+        await self.export_safely(output_dir)
+    
+    async def close(self) -> None:
+        """Cancel a pending debounced export (called on shutdown)."""
+        if self._pending and not self._pending.done():
+            self._pending.cancel()
+            await asyncio.gather(self._pending, return_exceptions=True)
+        self._pending = None
+    
+    def _write(
+        self,
+        root: Path,
+        listing: bytes,
+        details: dict[int, bytes],
+        stats: bytes,
+        sns: bytes,
+    ) -> dict:
+        root.mkdir(parents=True, exist_ok=True)
+        (root / "repos").mkdir(exist_ok=True)
+        
+        manifest = {
+            "generated_at": datetime.utcnow().isoformat() + "Z",
+            "encodings": ["gzip", "br"],
+            "repos": self._write_file(root, "repos", listing),
+            "repo": {
+                str(repo_id): self._write_file(root, f"repos/{repo_id}", body)
+                for repo_id, body in details.items()
+            },
+            "stats": self._write_file(root, "stats", stats),
+            "sns": self._write_file(root, "sns", sns),
+        }
+        
+        manifest_path = root / MANIFEST_NAME
+        previous = self._read_manifest(manifest_path)
+        
+        tmp_path = root / f".{MANIFEST_NAME}.tmp"
+        tmp_path.write_bytes(orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
+        os.replace(tmp_path, manifest_path)
+        
+        # Also keep whatever the manifest on disk points to now, in case it
+        # was replaced by a writer not holding the lock (e.g. a mid-deploy worker)
+        current = self._read_manifest(manifest_path)
+        self._prune(root, [manifest, current, previous])
+        return manifest
+    
+    @staticmethod
+    def _write_file(root: Path, name: str, body: bytes) -> str:
+        """Write body and its compressed variants under a content-hashed name."""
+        digest = hashlib.sha256(body).hexdigest()[:16]
+        relative = f"{name}.{digest}.json"
+        path = root / relative
+        
+        # Content-addressed: an existing file already has these bytes
+        if not path.exists():
+            path.with_name(path.name + ".gz").write_bytes(
+                gzip.compress(body, compresslevel=9, mtime=0)
+            )
+            path.with_name(path.name + ".br").write_bytes(
+                brotli.compress(body, quality=11)
+            )
+            path.write_bytes(body)
+        
+        return relative
+    
+    @staticmethod
+    def _read_manifest(path: Path) -> Optional[dict]:
+        try:
+            return orjson.loads(path.read_bytes())
+        except (OSError, orjson.JSONDecodeError):
+            return None
+    
+    @staticmethod
+    def _prune(root: Path, manifests: list[Optional[dict]]) -> None:
+        """Delete snapshot files referenced by none of the given manifests."""
+        keep = set()
+        for manifest in manifests:
+            if not manifest:
+                continue
+            keep.add(manifest.get("repos"))
+            keep.add(manifest.get("stats"))
+            keep.add(manifest.get("sns"))
+            keep.update(manifest.get("repo", {}).values())
+        
+        for path in list(root.glob("*.json*")) + list(root.glob("repos/*.json*")):
+            if path.name == MANIFEST_NAME:
+                continue
+            relative = path.relative_to(root).as_posix()
+            for suffix in (".gz", ".br"):
+                relative = relative.removesuffix(suffix)
+            if relative not in keep:
+                path.unlink(missing_ok=True)
+
+
+# Singleton instance
+snapshot_exporter = SnapshotExporter()
@@ -0,0 +1,130 @@
+"""GitHub webhook handling: signature verification and debounced single-repo resync."""
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+from typing import Optional
+from urllib.parse import parse_qs
+
+from app.config import get_settings
+from app.services.github import github_service
+from app.services.refresh_jobs import refresh_job_manager
+from app.services.repository import repository_service
+from app.services.snapshot import snapshot_exporter
+
+logger = logging.getLogger(__name__)
+
+
+def verify_signature(secret: str, body: bytes, signature_header: Optional[str]) -> bool:
+    """Verify the X-Hub-Signature-256 header of a webhook delivery."""
+    if not secret or not signature_header or not signature_header.startswith("sha256="):
+        return False
+    expected = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature_header[len("sha256="):])
+
+
+# Content types GitHub can deliver webhooks with
+PAYLOAD_CONTENT_TYPES = {"application/json", "application/x-www-form-urlencoded"}
+
+
+def parse_payload(body: bytes, content_type: str) -> dict:
+    """Decode a webhook body; form deliveries carry the JSON in a ``payload`` field.
+    
+    Raises:
+        ValueError: If the body is not a JSON object (or the form field is missing)
+    """
+    if content_type == "application/x-www-form-urlencoded":
+        fields = parse_qs(body.decode("utf-8"))
+        if "payload" not in fields:
+            raise ValueError("Missing payload form field")
+        body = fields["payload"][0].encode("utf-8")
+    
+    payload = json.loads(body)
+    if not isinstance(payload, dict):
+        raise ValueError("Payload is not a JSON object")
+    return payload
+
+
+async def resync_repository(full_name: str) -> bool:
+    """Refetch a single repository from GitHub and upsert it.
+    
+    Returns:
+        True if the repository was updated, False if it was skipped.
+    """
+    owner, _, repo_name = full_name.partition("/")
+    github_repo = await github_service.fetch_repo(owner, repo_name)
+    
+    if github_repo is None:
+        logger.warning(f"Webhook resync: repository {full_name} not found")
+        return False
+    
+    # Forks are skipped by the full refresh as well
+    if github_repo.get("fork", False):
+        return False
+    
+    repo = await github_service.fetch_repo_with_meta(github_repo)
+    await repository_service.upsert(repo)
+    await repository_service.refresh_stats()
+    snapshot_exporter.schedule()
+    logger.info(f"Webhook resync completed: {full_name}")
+    return True
+
+
+class RepoResyncDebouncer:
+    """Coalesces bursts of webhook deliveries into one resync per repository.
+    
+    Each new event for a repository restarts its timer, so a burst of pushes
+    triggers a single resync ``delay`` seconds after the last one.
+    """
+    
+    def __init__(self):
+        self._pending: dict[str, asyncio.Task] = {}
+    
+    def schedule(self, full_name: str, delay: Optional[float] = None) -> None:
+        """Schedule (or reschedule) a resync of the given repository."""
+        if delay is None:
+            delay = get_settings().github_webhook_debounce
+        
+        existing = self._pending.get(full_name)
+        if existing and not existing.done():
+            existing.cancel()
+        
+        self._pending[full_name] = asyncio.create_task(self._run(full_name, delay))
+    
+    async def _run(self, full_name: str, delay: float) -> None:
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            return
+        
+        # Past the debounce window - later events schedule a new task
+        if self._pending.get(full_name) is asyncio.current_task():
+            del self._pending[full_name]
+        
+        try:
+            # A running refresh may be writing this row with older data;
+            # try again after another debounce window
+            if await refresh_job_manager.is_locked():
+                logger.info(f"Refresh running, deferring webhook resync of {full_name}")
+                self.schedule(full_name, delay)
+                return
+            
+            await resync_repository(full_name)
+        except Exception as e:
+            logger.error(f"Webhook resync failed for {full_name}: {e}")
+    
+    def pending(self) -> list[str]:
+        """Get repositories waiting for a debounced resync."""
+        return [name for name, task in self._pending.items() if not task.done()]
+    
+    async def close(self) -> None:
+        """Cancel pending resyncs (called on shutdown)."""
+        for task in self._pending.values():
+            task.cancel()
+        await asyncio.gather(*self._pending.values(), return_exceptions=True)
+        self._pending.clear()
+
+
+# Singleton instance
+repo_resync_debouncer = RepoResyncDebouncer()
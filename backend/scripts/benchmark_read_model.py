@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+레포지토리 읽기 경로 벤치마크 (pydantic Repository vs row -> dict 읽기 모델)
+
+사용법:
+    python scripts/benchmark_read_model.py [rows ...]
+
+예시:
+    python scripts/benchmark_read_model.py            # 1000, 10000 행
+    python scripts/benchmark_read_model.py 500 50000
+
+DB 없이 합성 행(asyncpg Record 대신 dict)으로 측정합니다.
+두 경로의 JSON 출력이 같은지도 함께 확인합니다.
+"""
+
+import sys
+import os
+import time
+from datetime import date, datetime
+
+# 상위 디렉토리를 path에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.repository import encode_payload, repository_service
+
+
+def make_rows(count: int) -> list[dict]:
+    """SELECT * 결과와 같은 모양의 합성 행 생성"""
+    now = datetime.utcnow()
+    return [
+        {
+            "id": i,
+            "name": f"bench-repo-{i}",
+            "full_name": f"bench/bench-repo-{i}",
+            "description": "Benchmark repository",
+            "html_url": f"https://github.com/bench/bench-repo-{i}",
+            "language": "Python",
+            "stargazers_count": i % 50,
+            "topics": ["benchmark", "fastapi"],
+            "github_created_at": now,
+            "github_updated_at": now,
+            "github_pushed_at": now,
+            "title": f"Benchmark {i}",
+            "subtitle": "Synthetic project",
+            "project_type": ["web"],
+            "detailed_description": "Long description " * 20,
+            "features": [{"title": f"Feature {n}", "description": "Feature detail"} for n in range(5)],
+            "technologies": [{"name": "FastAPI", "category": "backend"}, {"name": "React", "category": "frontend"}],
+            "screenshots": [{"url": f"https://cdn.example.com/{i}/{n}.png", "caption": None, "order": n} for n in range(3)],
+            "challenges": "Challenges",
+            "achievements": "Achievements",
+            "priority": i % 5,
+            "roles": [{"title": "Developer", "description": "Everything"}],
+            "client_name": None,
+            "status": "completed",
+            "start_date": date(2024, 1, 1),
+            "end_date": None,
+            "is_ongoing": False,
+            "demo_url": None,
+            "documentation_url": None,
+            "cover_image": None,
+            "is_visible": True,
+            "category": "웹",
+            "lines_of_code": 12000,
+            "commit_count": 300,
+            "contributor_count": 1,
+            "languages": {"Python": 12000, "TypeScript": 8000},
+            "has_portfolio_meta": True,
+            "cached_at": now,
+            "content_hash": "0" * 64,
+        }
+        for i in range(count)
+    ]
+
+
+def measure(label: str, rows: list[dict], convert) -> tuple[float, bytes]:
+    start = time.perf_counter()
+    body = encode_payload({"repositories": [convert(row) for row in rows]}).body
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed * 1000:>9.1f} ms  {elapsed / len(rows) * 1e6:>7.2f} us/row")
+    return elapsed, body
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [1000, 10000]
+    
+    for size in sizes:
+        rows = make_rows(size)
+        print(f"{size} rows")
+        
+        old, old_body = measure(
+            "_row_to_repo + model_dump", rows,
+            lambda row: repository_service._row_to_repo(row).model_dump(),
+        )
+        new, new_body = measure("_row_to_dict", rows, repository_service._row_to_dict)
+        
+        print(f"  speedup {old / new:.1f}x, identical output: {old_body == new_body}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+레포지토리 upsert 벤치마크 (행 단위 upsert vs COPY 기반 bulk upsert)
+
+사용법:
+    python scripts/benchmark_upsert.py [rows ...]
+    
+예시:
+    python scripts/benchmark_upsert.py            # 100, 1000, 10000 행
+    python scripts/benchmark_upsert.py 500 5000
+
+주의: DATABASE_URL의 repositories 테이블에 합성 데이터(높은 ID 범위)를
+쓰고 측정 후 삭제합니다. 운영 DB에서는 실행하지 마세요.
+
+각 크기마다 insert(빈 테이블)와 update(기존 행 모두 변경) 두 경우를
+측정하며, 두 방식 모두 매번 같은 시작 상태로 테이블을 초기화합니다.
+"""
+
+import sys
+import asyncio
+import os
+import time
+from datetime import datetime
+
+# 상위 디렉토리를 path에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import init_db, close_db, get_pool
+from app.schemas.repo import Repository
+from app.services.repository import repository_service
+
+# 실제 GitHub 레포지토리 ID와 겹치지 않는 범위
+BASE_ID = 2_000_000_000
+
+
+def make_repos(count: int, stars: int = 0) -> list[Repository]:
+    """합성 Repository 데이터 생성 (stars를 바꾸면 content hash가 달라짐)"""
+    now = datetime.utcnow()
+    return [
+        Repository(
+            id=BASE_ID + i,
+            name=f"bench-repo-{i}",
+            full_name=f"bench/bench-repo-{i}",
+            description="Benchmark repository",
+            html_url=f"https://github.com/bench/bench-repo-{i}",
+            language="Python",
+            stargazers_count=stars,
+            topics=["benchmark"],
+            title=f"Benchmark {i}",
+            features=[{"title": "Feature", "description": "Benchmark feature"}],
+            technologies=[{"name": "FastAPI", "category": "backend"}],
+            languages={"Python": 12000, "TypeScript": 8000},
+            commit_count=100,
+            lines_of_code=500,
+            cached_at=now,
+        )
+        for i in range(count)
+    ]
+
+
+async def cleanup() -> None:
+    async with get_pool().acquire() as conn:
+        await conn.execute("DELETE FROM repositories WHERE id >= $1", BASE_ID)
+
+
+async def prepare(size: int, case: str) -> list[Repository]:
+    """각 방식이 같은 상태에서 시작하도록 테이블 초기화 후 측정할 데이터 반환
+    
+    insert: 빈 테이블에 새 행 삽입
+    update: 같은 행을 미리 채워 두고, 모든 행이 변경된(content hash가 다른) 데이터로 upsert
+    """
+    await cleanup()
+    if case == "update":
+        await repository_service.upsert_many(make_repos(size))
+        return make_repos(size, stars=1)
+    return make_repos(size)
+
+
+async def run_benchmark(sizes: list[int]) -> None:
+    await init_db()
+    
+    try:
+        print(f"{'rows':>8}  {'case':>6}  {'per-row (s)':>12}  {'bulk (s)':>10}  {'speedup':>8}")
+        for size in sizes:
+            for case in ("insert", "update"):
+                # 행 단위 upsert (기존 방식)
+                repos = await prepare(size, case)
+                start = time.perf_counter()
+                for repo in repos:
+                    await repository_service.upsert(repo)
+                per_row = time.perf_counter() - start
+                
+                # COPY + INSERT ... SELECT (새 방식)
+                repos = await prepare(size, case)
+                start = time.perf_counter()
+                await repository_service.upsert_many(repos)
+                bulk = time.perf_counter() - start
+                
+                print(f"{size:>8}  {case:>6}  {per_row:>12.3f}  {bulk:>10.3f}  {per_row / bulk:>7.1f}x")
+    finally:
+        await cleanup()
+        await close_db()
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [100, 1000, 10000]
+    asyncio.run(run_benchmark(sizes))
+
+
+if __name__ == "__main__":
+    main()
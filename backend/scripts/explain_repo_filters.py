@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+레포지토리 필터 쿼리 플랜 검사 (필터가 인덱스를 타는지 확인)
+
+사용법:
+    python scripts/explain_repo_filters.py [rows]
+
+예시:
+    python scripts/explain_repo_filters.py          # 합성 데이터 5000 행
+    python scripts/explain_repo_filters.py 20000
+
+/api/repos 의 category, language, technology, project_type, topic 필터로
+만들어지는 실제 쿼리(repository_service.build_page_query)를 EXPLAIN 하고,
+각 필터가 해당 인덱스를 사용하지 않으면 0이 아닌 코드로 종료합니다.
+
+주의: DATABASE_URL의 repositories 테이블에 합성 데이터(높은 ID 범위)를
+쓰고 검사 후 삭제합니다. 운영 DB에서는 실행하지 마세요.
+"""
+
+import sys
+import asyncio
+import os
+from datetime import datetime
+
+# 상위 디렉토리를 path에 추가
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import init_db, close_db, get_pool
+from app.schemas.repo import Repository
+from app.services.repository import SUMMARY_FIELDS, repository_service
+
+# 실제 GitHub 레포지토리 ID와 겹치지 않는 범위
+BASE_ID = 2_000_000_000
+
+# 드물게 나오는 값 (선택도가 높아야 플래너가 인덱스를 고름)
+RARE = "plan-check-rare"
+
+# 필터 -> (값, 사용되어야 하는 인덱스)
+CHECKS = {
+    "category": (RARE, "idx_repositories_category"),
+    "language": (RARE, "idx_repositories_language"),
+    "technology": (RARE, "idx_repositories_technologies"),
+    "project_type": (RARE, "idx_repositories_project_type"),
+    "topic": (RARE, "idx_repositories_topics"),
+}
+
+
+def make_repos(count: int) -> list[Repository]:
+    """합성 Repository 데이터 생성 (10개 행만 드문 값을 가짐)"""
+    now = datetime.utcnow()
+    repos = []
+    for i in range(count):
+        rare = i % (count // 10 or 1) == 0
+        repos.append(Repository(
+            id=BASE_ID + i,
+            name=f"plan-repo-{i}",
+            full_name=f"bench/plan-repo-{i}",
+            html_url=f"https://github.com/bench/plan-repo-{i}",
+            language=RARE if rare else "Python",
+            topics=[RARE] if rare else ["benchmark"],
+            project_type=[RARE] if rare else ["web"],
+            technologies=[{"name": RARE if rare else "FastAPI", "category": "backend"}],
+            category=RARE if rare else "웹",
+            priority=i % 5,
+            cached_at=now,
+        ))
+    return repos
+
+
+async def cleanup() -> None:
+    async with get_pool().acquire() as conn:
+        await conn.execute("DELETE FROM repositories WHERE id >= $1", BASE_ID)
+
+
+def plan_indexes(node: dict) -> set[str]:
+    """EXPLAIN JSON 플랜에서 사용된 인덱스 이름 수집"""
+    names = set()
+    if "Index Name" in node:
+        names.add(node["Index Name"])
+    for child in node.get("Plans", []):
+        names |= plan_indexes(child)
+    return names
+
+
+async def run_checks(rows: int) -> bool:
+    await init_db()
+    
+    ok = True
+    try:
+        await cleanup()
+        repos = make_repos(rows)
+        await repository_service.upsert_many(repos)
+        
+        async with get_pool().acquire() as conn:
+            # upsert는 category를 쓰지 않으므로 직접 설정
+            await conn.execute(
+                "UPDATE repositories SET category = $1 WHERE id >= $2 AND language = $1",
+                RARE, BASE_ID
+            )
+            await conn.execute("ANALYZE repositories")
+            
+            for name, (value, index) in CHECKS.items():
+                query, params = repository_service.build_page_query(
+                    SUMMARY_FIELDS, 24, filters={name: value}
+                )
+                # json 코덱이 등록되어 있어 플랜은 이미 파싱된 상태
+                plan = await conn.fetchval(f"EXPLAIN (FORMAT JSON) {query}", *params)
+                used = plan_indexes(plan[0]["Plan"])
+                
+                passed = index in used
+                ok = ok and passed
+                print(f"{'OK  ' if passed else 'FAIL'} {name:<13} -> {', '.join(sorted(used)) or 'seq scan'}")
+    finally:
+        await cleanup()
+        await close_db()
+    
+    return ok
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    sys.exit(0 if asyncio.run(run_checks(rows)) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+공개 API 정적 스냅샷 내보내기 (CDN/엣지 서빙용)
+
+사용법:
+    python scripts/export_snapshot.py [output_dir]
+    
+예시:
+    python scripts/export_snapshot.py                  # ../public/data
+    python scripts/export_snapshot.py /tmp/snapshot
+
+/api/repos, /api/repos/{id}, /api/repos/stats, /api/settings/sns 응답을 content-hash 파일명의
+JSON(+ .gz, .br)으로 쓰고 manifest.json 에 경로를 기록합니다.
+프론트엔드는 manifest.json 만 재검증하고 나머지 파일은 영구 캐시하면 됩니다.
+"""
+
+import sys
+import asyncio
+import os
+
+# 상위 디렉토리를 path에 추가
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.database import init_db, close_db
+from app.services.snapshot import snapshot_exporter
+
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.dirname(BACKEND_DIR), "public", "data")
+
+
+async def export(output_dir: str):
+    """스냅샷 내보내기"""
+    await init_db()
+    
+    try:
+        manifest = await snapshot_exporter.export(output_dir)
+        print(f"✅ 스냅샷 내보내기 완료: {output_dir}")
+        print(f"   repos: {manifest['repos']}")
+        print(f"   repo:  {len(manifest['repo'])}개")
+        print(f"   stats: {manifest['stats']}")
+        print(f"   sns:   {manifest['sns']}")
+        print(f"   압축:  {', '.join(manifest['encodings'])}")
+    finally:
+        await close_db()
+
+
+def main():
+    output_dir = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_OUTPUT_DIR
+    asyncio.run(export(os.path.abspath(output_dir)))
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,7 @@ CREATE TABLE repositories (
   topics TEXT[],
   github_created_at TIMESTAMPTZ,
   github_updated_at TIMESTAMPTZ,
+  github_pushed_at TIMESTAMPTZ,
   
   -- Custom metadata from portfolio/meta.json
   title TEXT,
@@ -50,9 +51,30 @@ CREATE TABLE repositories (
   contributor_count INT DEFAULT 1,
   languages JSONB DEFAULT '{}',  -- Language breakdown (language -> bytes)
   
+  -- Architecture & technical details (served by the detail endpoint only)
+  architecture TEXT,
+  system_components JSONB DEFAULT '[]',
+  core_principles JSONB DEFAULT '[]',
+  auth_flow JSONB DEFAULT '[]',
+  data_models JSONB DEFAULT '[]',
+  technical_challenges JSONB DEFAULT '[]',
+  key_achievements JSONB DEFAULT '[]',
+  code_snippets JSONB DEFAULT '[]',
+  
   -- Cache management
   has_portfolio_meta BOOLEAN DEFAULT false,
-  cached_at TIMESTAMPTZ DEFAULT NOW()
+  cached_at TIMESTAMPTZ DEFAULT NOW(),
+  content_hash VARCHAR(64),
+  
+  -- Full-text search ('simple' config keeps Korean tokens as-is)
+  search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(name, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(subtitle, '') || ' ' ||
+        coalesce(jsonb_path_query_array(technologies, '$[*].name')::text, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce(description, '')), 'C') ||
+    setweight(to_tsvector('simple', coalesce(detailed_description, '') || ' ' ||
+        coalesce(challenges, '') || ' ' || coalesce(achievements, '')), 'D')
+  ) STORED
 );
 
 -- Indexes for common queries
@@ -60,6 +82,15 @@ CREATE INDEX idx_repos_priority ON repositories(priority DESC);
 CREATE INDEX idx_repos_cached_at ON repositories(cached_at);
 CREATE INDEX idx_repos_has_meta ON repositories(has_portfolio_meta);
 CREATE INDEX idx_repos_status ON repositories(status);
+CREATE INDEX idx_repos_keyset ON repositories(
+  priority DESC, (COALESCE(github_updated_at, '-infinity')) DESC, id DESC
+) WHERE is_visible = true;
+CREATE INDEX idx_repos_technologies ON repositories USING GIN (technologies jsonb_path_ops);
+CREATE INDEX idx_repos_project_type ON repositories USING GIN (project_type jsonb_path_ops);
+CREATE INDEX idx_repos_topics ON repositories USING GIN (topics);
+CREATE INDEX idx_repos_language ON repositories(language);
+CREATE INDEX idx_repos_category ON repositories(category);
+CREATE INDEX idx_repos_search ON repositories USING GIN (search_vector);
 
 -- Comment for documentation
 COMMENT ON TABLE repositories IS 'Cached GitHub repositories with custom portfolio metadata';